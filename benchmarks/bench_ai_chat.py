@@ -0,0 +1,154 @@
+"""Drive simulated AI chat traffic through the AIChat cog against the local mock.
+
+Each simulated channel posts messages from distinct users at a fixed
+interval; the run reports throughput, reply latency percentiles and peak
+concurrency. Run from the repository root:
+    python benchmarks/bench_ai_chat.py --channels 50 --messages 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_openai import MockServer, add_mock_arguments, settings_from_args  # noqa: E402
+from utils.response_cache import ResponseCache  # noqa: E402
+
+BUSY_PREFIX = "I'm answering a lot"
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.bot = False
+        self.display_name = f"user{user_id}"
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, api_latency: float):
+        self.id = channel_id
+        self.name = "ai-chat"
+        self.api_latency = api_latency
+
+    def typing(self):
+        return _Typing()
+
+    async def send(self, content=None, **kwargs):
+        await asyncio.sleep(self.api_latency)
+        return FakeMessage(self, FakeUser(0), content or "")
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeMessage:
+    def __init__(self, channel: FakeChannel, author: FakeUser, content: str):
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.replies: list[str] = []
+
+    async def reply(self, content=None, **kwargs):
+        await asyncio.sleep(self.channel.api_latency)
+        self.replies.append(content or "")
+        return FakeMessage(self.channel, FakeUser(0), content or "")
+
+    async def edit(self, content=None, **kwargs):
+        await asyncio.sleep(self.channel.api_latency)
+        self.content = content
+
+
+def percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]
+
+
+async def run(args: argparse.Namespace):
+    server = MockServer(settings_from_args(args))
+    await server.start(port=args.port)
+
+    # The cog reads its endpoint and key from the environment at import time
+    os.environ["AI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENROUTER_API_KEY", "mock")
+    import cogs.ai_chat as ai_chat
+
+    ai_chat.AI_STREAM = not args.blocking
+    cog = ai_chat.AIChat(bot=None)
+    cog.cache = ResponseCache(cog.cache.ttl, cog.cache.max_entries, cog.cache.max_bytes)
+
+    latencies: list[float] = []
+    shed = failed = 0
+    active = peak = 0
+
+    async def deliver(message: FakeMessage):
+        nonlocal shed, failed, active, peak
+        active += 1
+        peak = max(peak, active)
+        start = time.perf_counter()
+        try:
+            await cog.handle_message(message)
+        finally:
+            active -= 1
+        if not message.replies or message.replies[0].startswith("Sorry"):
+            failed += 1
+        elif message.replies[0].startswith(BUSY_PREFIX):
+            shed += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+
+    rng = random.Random(1)
+
+    async def channel_traffic(index: int):
+        channel = FakeChannel(1000 + index, args.discord_latency)
+        tasks = []
+        for n in range(args.messages):
+            author = FakeUser(index * args.messages + n + 1)
+            question = rng.randrange(args.questions) if args.questions else f"{index}-{n}"
+            message = FakeMessage(channel, author, f"question {question}: how do roles work?")
+            tasks.append(asyncio.create_task(deliver(message)))
+            await asyncio.sleep(args.interval)
+        await asyncio.gather(*tasks)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(channel_traffic(i) for i in range(args.channels)))
+    elapsed = time.perf_counter() - start
+    await server.stop()
+
+    total = args.channels * args.messages
+    mode = "blocking" if args.blocking else "stream"
+    print(f"{total} messages over {args.channels} channels ({mode}) in {elapsed:.1f} s")
+    print(f"  throughput     {len(latencies) / elapsed:8.2f} replies/s")
+    if latencies:
+        print(f"  reply latency  p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+              f"p95 {percentile(latencies, 95) * 1000:.0f} ms, p99 {percentile(latencies, 99) * 1000:.0f} ms")
+    print(f"  answered {len(latencies)}, busy {shed}, failed {failed}")
+    print(f"  peak concurrency  {peak} messages in the cog, {server.peak_in_flight} upstream requests")
+    print(f"  upstream requests {server.requests} ({server.errors} errors), hedges {cog.router.hedges} "
+          f"({cog.router.hedges_skipped} skipped with no free slot)")
+    print(f"  cache             {cog.cache.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=10, help="messages per channel")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between messages in a channel")
+    parser.add_argument("--discord-latency", type=float, default=0.05, help="simulated Discord API call time")
+    parser.add_argument("--questions", type=int, default=0,
+                        help="draw messages from this many distinct questions (0: every message is unique)")
+    parser.add_argument("--blocking", action="store_true", help="disable streaming replies")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
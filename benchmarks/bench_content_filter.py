@@ -0,0 +1,82 @@
+"""Compare ContentFilter with a naive compiled-regex-per-pattern loop.
+
+Run from the repository root:
+    python benchmarks/bench_content_filter.py
+"""
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.content_filter import ContentFilter  # noqa: E402
+
+SIZES = (100, 1_000, 10_000)
+MESSAGES = 2_000
+WORDS = "hey anyone know how to get the role for events later today lol thanks check this link out".split()
+
+
+def random_word(k: int) -> str:
+    return "".join(random.choices(string.ascii_lowercase, k=k))
+
+
+def blocklists(size: int) -> tuple[list[str], list[str]]:
+    phrases = [f"{random_word(5)} {random_word(6)}" for _ in range(size // 2)]
+    domains = [f"{random_word(8)}.{random.choice(['com', 'net', 'ru', 'xyz'])}" for _ in range(size // 2)]
+    return phrases, domains
+
+
+def messages(phrases: list[str], domains: list[str]) -> list[str]:
+    out = []
+    for _ in range(MESSAGES):
+        words = random.choices(WORDS, k=random.randint(5, 40))
+        roll = random.random()
+        if roll < 0.05:
+            words.insert(random.randrange(len(words)), random.choice(phrases))
+        elif roll < 0.10:
+            words.append(f"https://login.{random.choice(domains)}/gift")
+        elif roll < 0.20:
+            words.append(f"https://{random_word(7)}.com/page")
+        out.append(" ".join(words))
+    return out
+
+
+def naive_filter(phrases: list[str], domains: list[str]):
+    patterns = [re.compile(r"\b" + re.escape(p) + r"\b", re.IGNORECASE) for p in phrases]
+    patterns += [re.compile(r"(?:^|[/.\s])" + re.escape(d) + r"\b", re.IGNORECASE) for d in domains]
+
+    def check(content: str) -> bool:
+        return any(p.search(content) for p in patterns)
+    return check
+
+
+def timed(check, texts: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    hits = sum(1 for t in texts if check(t))
+    return (time.perf_counter() - start) / len(texts) * 1e6, hits
+
+
+def main():
+    random.seed(1)
+    print(f"{'patterns':>9} | {'naive regex':>22} | {'ContentFilter':>22} | build")
+    for size in SIZES:
+        phrases, domains = blocklists(size)
+        texts = messages(phrases, domains)
+
+        naive_us, naive_hits = timed(naive_filter(phrases, domains), texts)
+        start = time.perf_counter()
+        content_filter = ContentFilter(phrases, domains, block_invites=False)
+        build_ms = (time.perf_counter() - start) * 1000
+        fast_us, fast_hits = timed(content_filter.check, texts)
+
+        print(
+            f"{size:>9,} | {naive_us:9.1f} µs/msg {naive_hits:4} hits | "
+            f"{fast_us:9.1f} µs/msg {fast_hits:4} hits | {build_ms:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
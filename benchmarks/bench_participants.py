@@ -0,0 +1,71 @@
+"""Compare the set-based giveaway participant path with ParticipantStore.
+
+Run from the repository root:
+    python benchmarks/bench_participants.py
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.participants import ParticipantStore  # noqa: E402
+
+SIZES = (10_000, 100_000, 1_000_000)
+WINNERS = 3
+DRAWS = 20
+
+
+def snowflakes(count: int) -> list[int]:
+    # Realistic 64-bit Discord IDs (2015-2026 timestamps)
+    return [random.randrange(80_000_000_000_000_000, 1_500_000_000_000_000_000) for _ in range(count)]
+
+
+def measure_memory(build) -> tuple[object, int]:
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def set_draw(participants: set[int], count: int) -> list[int]:
+    # The original pick_winners: copy the pool on every draw
+    pool = list(participants)
+    return random.sample(pool, min(count, len(pool)))
+
+
+def bench(size: int):
+    ids = snowflakes(size)
+
+    # Count the boxed ints too: the set path keeps one object per entrant alive
+    participants, set_bytes = measure_memory(lambda: {int(str(i)) for i in ids})
+    store, store_bytes = measure_memory(lambda: ParticipantStore(ids))
+
+    start = time.perf_counter()
+    for _ in range(DRAWS):
+        set_draw(participants, WINNERS)
+    set_ms = (time.perf_counter() - start) / DRAWS * 1000
+
+    start = time.perf_counter()
+    for _ in range(DRAWS):
+        store.draw(WINNERS)
+    store_ms = (time.perf_counter() - start) / DRAWS * 1000
+
+    print(
+        f"{size:>10,} | set {set_bytes / size:6.1f} B/entrant {set_ms:9.3f} ms/draw"
+        f" | store {store_bytes / size:6.1f} B/entrant {store_ms:9.4f} ms/draw"
+    )
+
+
+def main():
+    random.seed(1)
+    print(f"{'entrants':>10} | draw of {WINNERS} winners, averaged over {DRAWS} draws")
+    for size in SIZES:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Welcome card throughput and event-loop lag under a 100-join burst.
+
+Renders cards inline on the event loop, in a thread pool and in a process
+pool, while a ticker measures how late the loop wakes up. Avatar downloads
+are simulated with a fixed delay, and some joiners share avatars (default
+avatars, alts) to exercise the LRU. Run from the repository root:
+    python benchmarks/bench_welcome_cards.py
+"""
+import asyncio
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+from utils.welcome_card import WelcomeCardRenderer, _init_worker, render_card  # noqa: E402
+
+JOINS = 100
+UNIQUE_AVATARS = 60
+DOWNLOAD_DELAY = 0.02
+TICK = 0.005
+
+
+def avatar_png(seed: int) -> bytes:
+    rng = random.Random(seed)
+    image = Image.new("RGB", (256, 256), tuple(rng.randrange(256) for _ in range(3)))
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+class FakeAsset:
+    def __init__(self, key: str, data: bytes):
+        self.key = key
+        self.data = data
+
+    def replace(self, **kwargs):
+        return self
+
+    async def read(self) -> bytes:
+        await asyncio.sleep(DOWNLOAD_DELAY)
+        return self.data
+
+
+class FakeGuild:
+    id = 1
+    name = "Monster"
+    member_count = 12_000
+
+
+class FakeMember:
+    guild = FakeGuild()
+
+    def __init__(self, index: int, avatars: list[bytes]):
+        slot = index % UNIQUE_AVATARS
+        self.display_name = f"new_member_{index}"
+        self.display_avatar = FakeAsset(str(slot), avatars[slot])
+
+
+async def measure_lag(stop: asyncio.Event) -> list[float]:
+    lags = []
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK)
+        lags.append(loop.time() - start - TICK)
+    return lags
+
+
+async def burst(render) -> tuple[float, list[float]]:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await asyncio.gather(*(render(i) for i in range(JOINS)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await ticker
+
+
+def report(label: str, elapsed: float, lags: list[float]):
+    lags.sort()
+    p95 = lags[int(len(lags) * 0.95)] * 1000
+    print(f"{label:>14} | {JOINS / elapsed:7.1f} cards/s | loop lag p95 {p95:7.1f} ms, max {lags[-1] * 1000:7.1f} ms")
+
+
+async def main():
+    avatars = [avatar_png(i) for i in range(UNIQUE_AVATARS)]
+    members = [FakeMember(i, avatars) for i in range(JOINS)]
+
+    # Baseline: download and draw on the event loop itself
+    _init_worker(None)
+
+    async def inline(i: int):
+        member = members[i]
+        data = await member.display_avatar.read()
+        render_card(data, member.display_name, 12_000, "Monster", None)
+
+    report("inline", *await burst(inline))
+
+    for label, processes in (("thread pool", False), ("process pool", True)):
+        renderer = WelcomeCardRenderer(workers=os.cpu_count() or 2, processes=processes)
+        # Warm the workers so the burst measures steady-state rendering
+        await asyncio.gather(*(renderer.render(members[0]) for _ in range(4)))
+        renderer.avatar_hits = renderer.avatar_misses = 0
+
+        async def pooled(i: int, renderer=renderer):
+            await renderer.render(members[i])
+
+        report(label, *await burst(pooled))
+        print(f"{'':>14} | avatar cache {renderer.avatar_hits} hits, {renderer.avatar_misses} downloads")
+        renderer.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+"""Local stand-in for an OpenAI-compatible chat completions endpoint.
+
+Serves ``POST /v1/chat/completions``, streaming or not, with configurable
+first-token latency, token rate and error rate, so AI chat can be
+load-tested without spending upstream quota. Run from the repository root:
+    python benchmarks/mock_openai.py --latency lognormal:0.8:0.5 --error-rate 0.02
+
+and point the bot at it with ``AI_BASE_URL=http://127.0.0.1:8765/v1``.
+
+Latency specs: ``fixed:S``, ``uniform:LOW:HIGH``, ``exp:MEAN`` and
+``lognormal:MEDIAN:SIGMA`` (all in seconds). ``--model NAME=SPEC`` gives a
+single model its own latency, e.g. to exercise hedging.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import Callable
+
+from aiohttp import web
+
+WORDS = (
+    "the bot can help with that question and here is a short answer with some detail "
+    "about how discord servers roles channels and permissions usually work together"
+).split()
+
+
+def latency_sampler(spec: str) -> Callable[[], float]:
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1 / values[0])
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"unknown latency distribution: {spec}")
+
+
+class MockSettings:
+    def __init__(self, latency: str = "fixed:0.5", tokens_per_second: float = 50.0,
+                 reply_tokens: int = 80, error_rate: float = 0.0, models: dict[str, str] | None = None):
+        self.latency = latency_sampler(latency)
+        self.model_latency = {name: latency_sampler(spec) for name, spec in (models or {}).items()}
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+
+
+class MockServer:
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.app = web.Application()
+        self.app.router.add_post("/v1/chat/completions", self.completions)
+        self._runner: web.AppRunner | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765):
+        # Like a real provider, stop working on a request once its client hangs up,
+        # so abandoned hedges do not count as in flight
+        self._runner = web.AppRunner(self.app, handler_cancellation=True)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    def _tokens(self) -> list[str]:
+        return [random.choice(WORDS) + " " for _ in range(self.settings.reply_tokens)]
+
+    async def completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        model = body.get("model", "mock")
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.settings.model_latency.get(model, self.settings.latency)())
+            if random.random() < self.settings.error_rate:
+                self.errors += 1
+                return web.json_response(
+                    {"error": {"message": "mock upstream error", "type": "server_error"}}, status=500,
+                )
+            if body.get("stream"):
+                return await self._stream(request, model)
+            return await self._complete(model)
+        finally:
+            self.in_flight -= 1
+
+    def _envelope(self, model: str, kind: str) -> dict:
+        return {"id": f"chatcmpl-{uuid.uuid4().hex}", "object": kind, "created": int(time.time()), "model": model}
+
+    async def _complete(self, model: str) -> web.Response:
+        tokens = self._tokens()
+        await asyncio.sleep(len(tokens) / self.settings.tokens_per_second)
+        payload = self._envelope(model, "chat.completion")
+        payload["choices"] = [{
+            "index": 0, "message": {"role": "assistant", "content": "".join(tokens)}, "finish_reason": "stop",
+        }]
+        payload["usage"] = {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)}
+        return web.json_response(payload)
+
+    async def _stream(self, request: web.Request, model: str) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        envelope = self._envelope(model, "chat.completion.chunk")
+
+        async def send(delta: dict, finish_reason: str | None = None):
+            chunk = {**envelope, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        try:
+            for i, token in enumerate(self._tokens()):
+                if i:
+                    await asyncio.sleep(1 / self.settings.tokens_per_second)
+                await send({"role": "assistant", "content": token} if i == 0 else {"content": token})
+            await send({}, "stop")
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+        except ConnectionResetError:
+            # The client hung up, e.g. a hedge that lost the race
+            pass
+        return response
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", default="lognormal:0.8:0.5", help="first-token latency distribution")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--reply-tokens", type=int, default=80)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--model", action="append", default=[], metavar="NAME=SPEC",
+                        help="latency distribution for one model")
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    models = dict(entry.split("=", 1) for entry in args.model)
+    return MockSettings(args.latency, args.tokens_per_second, args.reply_tokens, args.error_rate, models)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockServer(settings_from_args(args))
+    await server.start(args.host, args.port)
+    print(f"Mock chat completions on http://{args.host}:{args.port}/v1 (Ctrl+C to stop)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
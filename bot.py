@@ -3,6 +3,9 @@ import os
 import asyncio
 from discord.ext import commands
 from dotenv import load_dotenv
+from config import CHANNEL_MULTI_ROLES, CHANNEL_NAMES
+from utils.channel_registry import ChannelRegistry
+from utils.message_router import MessageRouter
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +21,11 @@ intents.message_content = True
 # Setup bot
 bot = commands.Bot(command_prefix='!', intents=intents)
 
+# Cogs register message handlers here instead of each filtering every message
+bot.message_router = MessageRouter(bot)
+# Cogs look up their channels by role (welcome, ai, ...) instead of by name
+bot.channel_registry = ChannelRegistry(bot, CHANNEL_NAMES, CHANNEL_MULTI_ROLES)
+
 # Load cogs
 async def load_extensions():
     for filename in os.listdir('./cogs'):
@@ -31,6 +39,11 @@ async def on_ready():
     print(f'ID: {bot.user.id}')
     await bot.tree.sync() # Sync slash commands
 
+@bot.event
+async def on_message(message):
+    bot.message_router.dispatch(message)
+    await bot.process_commands(message)
+
 async def main():
     async with bot:
         await load_extensions()
@@ -3,22 +3,28 @@ from __future__ import annotations
 import discord
 from discord.ext import commands
 from discord import app_commands
-import random
 import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from config import VERIFY_ROLE_ID, is_admin
+from config import CHANNEL_NAMES, GIVEAWAY_EDIT_INTERVAL, GIVEAWAY_HISTORY_SIZE, VERIFY_ROLE_ID, is_admin
+from utils.giveaway_store import GiveawayStore
+from utils.participants import ParticipantStore
+from utils.scheduler import DeadlineScheduler
 
 
 class GiveawayJoinView(discord.ui.View):
-    def __init__(self, cog: "Giveaway"):
+    def __init__(self, cog: "Giveaway", message_id: int):
         super().__init__(timeout=None)
         self.cog = cog
+        self.message_id = message_id
+        # One custom_id per giveaway so clicks route straight to their entry
+        self.join_giveaway.custom_id = f"giveaway_join:{message_id}"
 
-    @discord.ui.button(label="Join Giveaway 🎉", style=discord.ButtonStyle.green, custom_id="giveaway_join_btn")
+    @discord.ui.button(label="Join Giveaway 🎉", style=discord.ButtonStyle.green, custom_id="giveaway_join")
     async def join_giveaway(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.cog.active_giveaway is None:
-            await interaction.response.send_message("There is no active giveaway right now.", ephemeral=True)
+        giveaway = self.cog.giveaways.get(self.message_id)
+        if giveaway is None:
+            await interaction.response.send_message("This giveaway is no longer running.", ephemeral=True)
             return
 
         verify_role = interaction.guild.get_role(VERIFY_ROLE_ID)
@@ -26,8 +32,6 @@ class GiveawayJoinView(discord.ui.View):
             await interaction.response.send_message("You must be verified to join the giveaway!", ephemeral=True)
             return
 
-        giveaway = self.cog.active_giveaway
-
         # Check required role
         if giveaway["required_role_id"] is not None:
             required_role = interaction.guild.get_role(giveaway["required_role_id"])
@@ -43,12 +47,66 @@ class GiveawayJoinView(discord.ui.View):
             return
 
         giveaway["participants"].add(interaction.user.id)
-
-        # Update the embed with new participant count
-        embed = build_active_embed(giveaway)
-        await interaction.message.edit(embed=embed)
+        self.cog.store.append(giveaway["message_id"], interaction.user.id)
         await interaction.response.send_message("You have entered the giveaway! Good luck! 🍀", ephemeral=True)
 
+        # The participant count on the embed is refreshed in batches
+        updater = self.cog._embed_updaters.get(self.message_id)
+        if updater is not None:
+            updater.touch()
+
+
+class GiveawayEmbedUpdater:
+    """Coalesces participant-count edits on a live giveaway message.
+
+    Joins only mark the embed as stale. A single pending task edits the
+    message at most once every ``interval`` seconds, and only when the
+    count actually changed since the last edit.
+    """
+
+    def __init__(self, bot, giveaway: dict, interval: float = GIVEAWAY_EDIT_INTERVAL):
+        self.bot = bot
+        self.giveaway = giveaway
+        self.interval = interval
+        self._flushed_count = len(giveaway["participants"])
+        self._last_edit = asyncio.get_running_loop().time()
+        self._task: asyncio.Task | None = None
+
+    def touch(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while len(self.giveaway["participants"]) != self._flushed_count:
+            delay = self._last_edit + self.interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.flush()
+
+    async def flush(self):
+        count = len(self.giveaway["participants"])
+        if count == self._flushed_count or self.giveaway["message_id"] is None:
+            return
+
+        channel = self.bot.get_channel(self.giveaway["channel_id"])
+        if channel is None:
+            return
+
+        # Record before awaiting so joins during the edit schedule another one
+        self._flushed_count = count
+        self._last_edit = asyncio.get_running_loop().time()
+        try:
+            message = channel.get_partial_message(self.giveaway["message_id"])
+            await message.edit(embed=build_active_embed(self.giveaway))
+        except discord.HTTPException as e:
+            print(f"Failed to update giveaway embed: {e}")
+
+    def close(self):
+        # The ended/cancelled embed replaces this one, so pending edits are dropped
+        if self._task and not self._task.done():
+            self._task.cancel()
+
 
 def build_active_embed(giveaway: dict) -> discord.Embed:
     role_text = "Everyone"
@@ -60,7 +118,7 @@ def build_active_embed(giveaway: dict) -> discord.Embed:
         description=(
             f"🎁 **Prize:** {giveaway['prize']}\n\n"
             f"⏰ **Ends:** <t:{int(giveaway['end_time'].timestamp())}:R>\n"
-            f"👑 **Hosted by:** {giveaway['host'].mention}\n"
+            f"👑 **Hosted by:** <@{giveaway['host_id']}>\n"
             f"🏆 **Winners:** {giveaway['winner_count']}\n"
             f"🎭 **Required Role:** {role_text}\n\n"
             f"👥 **Participants:** {len(giveaway['participants'])}\n\n"
@@ -86,7 +144,7 @@ def build_ended_embed(giveaway: dict, winner_mentions: list[str]) -> discord.Emb
         ),
         color=0xF1C40F,
     )
-    embed.set_footer(text=f"Hosted by {giveaway['host'].display_name}")
+    embed.set_footer(text=f"Hosted by {giveaway['host_name']}")
     return embed
 
 
@@ -98,24 +156,122 @@ def build_cancelled_embed() -> discord.Embed:
     )
 
 
-def pick_winners(participants: set[int], count: int) -> list[int]:
-    pool = list(participants)
-    return random.sample(pool, min(count, len(pool)))
+def serialize_giveaway(giveaway: dict) -> dict:
+    """Giveaway metadata for ``state.json``; participants live in the journal."""
+    data = {key: value for key, value in giveaway.items() if key != "participants"}
+    data["end_time"] = giveaway["end_time"].timestamp()
+    data["winner_ids"] = giveaway["participants"].winners
+    return data
+
+
+def deserialize_giveaway(data: dict, participants: ParticipantStore) -> dict:
+    giveaway = dict(data)
+    giveaway["end_time"] = datetime.fromtimestamp(data["end_time"], timezone.utc)
+    # Previous winners stay excluded from rerolls after a restart
+    for winner_id in giveaway.pop("winner_ids", []):
+        participants.mark_drawn(winner_id)
+    giveaway["participants"] = participants
+    return giveaway
+
+
+def mention_winners(guild: discord.Guild, winner_ids: list[int]) -> list[str]:
+    mentions = []
+    for wid in winner_ids:
+        member = guild.get_member(wid)
+        mentions.append(member.mention if member else f"<@{wid}>")
+    return mentions
+
+
+def parse_giveaway_id(value: str) -> int | None:
+    try:
+        return int(value.strip())
+    except ValueError:
+        return None
 
 
 class Giveaway(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.active_giveaway: dict | None = None
-        self.last_giveaway: dict | None = None
-        self._timer_task: asyncio.Task | None = None
+        # Running giveaways, and recently ended ones kept for rerolls, by message ID
+        self.giveaways: dict[int, dict] = {}
+        self.ended_giveaways: dict[int, dict] = {}
+        self.scheduler = DeadlineScheduler(self._on_deadline)
+        self._embed_updaters: dict[int, GiveawayEmbedUpdater] = {}
+        self._join_views: dict[int, GiveawayJoinView] = {}
+        self.store = GiveawayStore()
 
     async def cog_load(self):
-        self.bot.add_view(GiveawayJoinView(self))
+        self.store.start()
+        self._restore()
+        self.scheduler.start()
 
     async def cog_unload(self):
-        if self._timer_task and not self._timer_task.done():
-            self._timer_task.cancel()
+        self.scheduler.stop()
+        for message_id in list(self._join_views):
+            self._detach(message_id)
+        await self.store.close()
+
+    # ── Persistence ──────────────────────────────────────────────────
+
+    def _restore(self):
+        """Rebuild giveaways from disk and re-arm the running ones' deadlines."""
+        state = self.store.load_state()
+
+        for data in state.get("ended", []):
+            giveaway = deserialize_giveaway(data, self.store.load_participants(data["message_id"]))
+            self.ended_giveaways[giveaway["message_id"]] = giveaway
+
+        for data in state.get("active", []):
+            giveaway = deserialize_giveaway(data, self.store.load_participants(data["message_id"]))
+            self._attach(giveaway)
+            # Route clicks on the existing message without fetching it
+            self.bot.add_view(self._join_views[giveaway["message_id"]], message_id=giveaway["message_id"])
+
+        if self.giveaways:
+            print(f"Restored {len(self.giveaways)} running giveaway(s)")
+
+    async def _save_state(self):
+        await self.store.save_state({
+            "active": [serialize_giveaway(g) for g in self.giveaways.values()],
+            "ended": [serialize_giveaway(g) for g in self.ended_giveaways.values()],
+        })
+
+    # ── Per-giveaway runtime ─────────────────────────────────────────
+
+    def _attach(self, giveaway: dict):
+        message_id = giveaway["message_id"]
+        self.giveaways[message_id] = giveaway
+        self._join_views[message_id] = GiveawayJoinView(self, message_id)
+        self._embed_updaters[message_id] = GiveawayEmbedUpdater(self.bot, giveaway)
+        self.scheduler.schedule(message_id, giveaway["end_time"].timestamp())
+
+    def _detach(self, message_id: int) -> dict | None:
+        self.scheduler.cancel(message_id)
+        # The ended/cancelled embed carries the final participant count
+        updater = self._embed_updaters.pop(message_id, None)
+        if updater is not None:
+            updater.close()
+        view = self._join_views.pop(message_id, None)
+        if view is not None:
+            view.stop()
+        return self.giveaways.pop(message_id, None)
+
+    def _giveaway_choices(self, giveaways: dict[int, dict], interaction: discord.Interaction,
+                          current: str) -> list[app_commands.Choice[str]]:
+        choices = []
+        for message_id, giveaway in giveaways.items():
+            if giveaway.get("guild_id") not in (None, interaction.guild_id):
+                continue
+            label = f"{giveaway['prize']} ({message_id})"
+            if current.lower() in label.lower():
+                choices.append(app_commands.Choice(name=label[:100], value=str(message_id)))
+        return choices[:25]
+
+    async def _active_autocomplete(self, interaction: discord.Interaction, current: str):
+        return self._giveaway_choices(self.giveaways, interaction, current)
+
+    async def _ended_autocomplete(self, interaction: discord.Interaction, current: str):
+        return self._giveaway_choices(self.ended_giveaways, interaction, current)
 
     # ── Setup ────────────────────────────────────────────────────────
 
@@ -127,14 +283,7 @@ class Giveaway(commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
-        channel_name = "🎰｜giveaways"
-        channel = discord.utils.get(interaction.guild.channels, name=channel_name)
-
-        if not channel:
-            for c in interaction.guild.text_channels:
-                if "giveaway" in c.name:
-                    channel = c
-                    break
+        channel = self.bot.channel_registry.get(interaction.guild, "giveaways")
 
         if not channel:
             overwrites = {
@@ -145,7 +294,8 @@ class Giveaway(commands.Cog):
                     read_messages=True, send_messages=True
                 ),
             }
-            channel = await interaction.guild.create_text_channel(channel_name, overwrites=overwrites)
+            channel = await interaction.guild.create_text_channel(CHANNEL_NAMES["giveaways"][0], overwrites=overwrites)
+            self.bot.channel_registry.assign("giveaways", channel)
             await interaction.followup.send(f"Created giveaway channel: {channel.mention}", ephemeral=True)
         else:
             await interaction.followup.send(f"Using existing giveaway channel: {channel.mention}", ephemeral=True)
@@ -189,12 +339,6 @@ class Giveaway(commands.Cog):
             await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
             return
 
-        if self.active_giveaway is not None:
-            await interaction.response.send_message(
-                "A giveaway is already running! End it first with `/giveaway_end`.", ephemeral=True
-            )
-            return
-
         if duration_minutes < 1:
             await interaction.response.send_message("Duration must be at least 1 minute.", ephemeral=True)
             return
@@ -205,65 +349,72 @@ class Giveaway(commands.Cog):
 
         end_time = datetime.now(timezone.utc) + timedelta(minutes=duration_minutes)
 
-        self.active_giveaway = {
+        giveaway = {
             "prize": prize,
-            "host": interaction.user,
+            "host_id": interaction.user.id,
+            "host_name": interaction.user.display_name,
+            "guild_id": interaction.guild_id,
             "channel_id": interaction.channel_id,
             "message_id": None,
             "end_time": end_time,
-            "participants": set(),
+            "participants": ParticipantStore(),
             "winner_count": winners,
             "required_role_id": required_role.id if required_role else None,
             "guild_icon": interaction.guild.icon.url if interaction.guild.icon else None,
         }
 
-        view = GiveawayJoinView(self)
-        embed = build_active_embed(self.active_giveaway)
-
-        await interaction.response.send_message(embed=embed, view=view)
+        # The join button's custom_id embeds the message ID, so it is added once the message exists
+        await interaction.response.send_message(embed=build_active_embed(giveaway))
         msg = await interaction.original_response()
-        self.active_giveaway["message_id"] = msg.id
+        giveaway["message_id"] = msg.id
 
-        self._timer_task = self.bot.loop.create_task(self._auto_end(duration_minutes * 60))
+        self._attach(giveaway)
+        await msg.edit(view=self._join_views[msg.id])
+        await self._save_state()
 
-    # ── Auto-end timer ───────────────────────────────────────────────
+    # ── Deadlines ────────────────────────────────────────────────────
 
-    async def _auto_end(self, seconds: float):
-        await asyncio.sleep(seconds)
-        await self._end_giveaway()
+    async def _on_deadline(self, message_id: int):
+        # A restored giveaway may already be overdue; end it once the cache is ready
+        await self.bot.wait_until_ready()
+        await self._end_giveaway(message_id)
 
     # ── End (shared logic) ───────────────────────────────────────────
 
-    async def _end_giveaway(self):
-        if self.active_giveaway is None:
+    async def _end_giveaway(self, message_id: int):
+        giveaway = self._detach(message_id)
+        if giveaway is None:
             return
 
-        giveaway = self.active_giveaway
-        self.active_giveaway = None
-        self.last_giveaway = giveaway
+        winner_ids = giveaway["participants"].draw(giveaway["winner_count"])
+
+        self.ended_giveaways[message_id] = giveaway
+        evicted = []
+        while len(self.ended_giveaways) > GIVEAWAY_HISTORY_SIZE:
+            evicted.append(self.ended_giveaways.pop(next(iter(self.ended_giveaways))))
+
+        # Keep the ended giveaway's journal for /giveaway_reroll, drop the evicted ones
+        await self.store.flush()
+        await self._save_state()
+        for old in evicted:
+            await self.store.delete_journal(old["message_id"])
 
         channel = self.bot.get_channel(giveaway["channel_id"])
         if channel is None:
             return
 
-        participants = giveaway["participants"]
-
-        if not participants:
+        if not winner_ids:
             winner_mentions = []
             announce_text = "🎰 **Giveaway ended!** No one participated. No winner this time."
         else:
-            winner_ids = pick_winners(participants, giveaway["winner_count"])
-            winner_mentions = []
-            for wid in winner_ids:
-                member = channel.guild.get_member(wid)
-                winner_mentions.append(member.mention if member else f"<@{wid}>")
+            winner_mentions = mention_winners(channel.guild, winner_ids)
             announce_text = None
 
         embed = build_ended_embed(giveaway, winner_mentions)
 
         # Edit original message to disable the button
         try:
-            msg = await channel.fetch_message(giveaway["message_id"])
+            msg = channel.get_partial_message(message_id)
             ended_view = discord.ui.View()
             btn = discord.ui.Button(
                 label="Giveaway Ended", style=discord.ButtonStyle.grey,
@@ -282,45 +433,82 @@ class Giveaway(commands.Cog):
 
     # ── End command ──────────────────────────────────────────────────
 
-    @app_commands.command(name="giveaway_end", description="End the current giveaway early")
-    async def end_giveaway(self, interaction: discord.Interaction):
+    @app_commands.command(name="giveaway_end", description="End a running giveaway early")
+    @app_commands.describe(giveaway_id="Message ID of the giveaway")
+    @app_commands.autocomplete(giveaway_id=_active_autocomplete)
+    async def end_giveaway(self, interaction: discord.Interaction, giveaway_id: str):
         if not is_admin(interaction.user):
             await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
             return
 
-        if self.active_giveaway is None:
-            await interaction.response.send_message("There is no active giveaway to end.", ephemeral=True)
+        message_id = parse_giveaway_id(giveaway_id)
+        if message_id not in self.giveaways:
+            await interaction.response.send_message("There is no running giveaway with that ID.", ephemeral=True)
             return
 
-        if self._timer_task and not self._timer_task.done():
-            self._timer_task.cancel()
-
         await interaction.response.send_message("Ending giveaway...", ephemeral=True)
-        await self._end_giveaway()
+        await self._end_giveaway(message_id)
 
-    # ── Cancel command ───────────────────────────────────────────────
+    # ── Extend command ───────────────────────────────────────────────
 
-    @app_commands.command(name="giveaway_cancel", description="Cancel the active giveaway without picking a winner")
-    async def cancel_giveaway(self, interaction: discord.Interaction):
+    @app_commands.command(name="giveaway_extend", description="Change how long a running giveaway lasts")
+    @app_commands.describe(giveaway_id="Message ID of the giveaway", minutes="Minutes to add (negative to shorten)")
+    @app_commands.autocomplete(giveaway_id=_active_autocomplete)
+    async def extend_giveaway(self, interaction: discord.Interaction, giveaway_id: str, minutes: int):
         if not is_admin(interaction.user):
             await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
             return
 
-        if self.active_giveaway is None:
-            await interaction.response.send_message("There is no active giveaway to cancel.", ephemeral=True)
+        message_id = parse_giveaway_id(giveaway_id)
+        giveaway = self.giveaways.get(message_id)
+        if giveaway is None:
+            await interaction.response.send_message("There is no running giveaway with that ID.", ephemeral=True)
             return
 
-        if self._timer_task and not self._timer_task.done():
-            self._timer_task.cancel()
+        end_time = giveaway["end_time"] + timedelta(minutes=minutes)
+        if end_time <= datetime.now(timezone.utc):
+            await interaction.response.send_message("That would end the giveaway in the past.", ephemeral=True)
+            return
 
-        giveaway = self.active_giveaway
-        self.active_giveaway = None
+        giveaway["end_time"] = end_time
+        self.scheduler.schedule(message_id, end_time.timestamp())
+        await self._save_state()
+
+        channel = self.bot.get_channel(giveaway["channel_id"])
+        if channel:
+            try:
+                await channel.get_partial_message(message_id).edit(embed=build_active_embed(giveaway))
+            except discord.HTTPException as e:
+                print(f"Failed to update giveaway embed: {e}")
+
+        await interaction.response.send_message(
+            f"Giveaway now ends <t:{int(end_time.timestamp())}:R>.", ephemeral=True
+        )
+
+    # ── Cancel command ───────────────────────────────────────────────
+
+    @app_commands.command(name="giveaway_cancel", description="Cancel a running giveaway without picking a winner")
+    @app_commands.describe(giveaway_id="Message ID of the giveaway")
+    @app_commands.autocomplete(giveaway_id=_active_autocomplete)
+    async def cancel_giveaway(self, interaction: discord.Interaction, giveaway_id: str):
+        if not is_admin(interaction.user):
+            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+            return
+
+        message_id = parse_giveaway_id(giveaway_id)
+        giveaway = self._detach(message_id) if message_id is not None else None
+        if giveaway is None:
+            await interaction.response.send_message("There is no running giveaway with that ID.", ephemeral=True)
+            return
+
+        await self._save_state()
+        await self.store.delete_journal(message_id)
 
         channel = self.bot.get_channel(giveaway["channel_id"])
         if channel:
             embed = build_cancelled_embed()
             try:
-                msg = await channel.fetch_message(giveaway["message_id"])
+                msg = channel.get_partial_message(message_id)
                 cancelled_view = discord.ui.View()
                 btn = discord.ui.Button(
                     label="Giveaway Cancelled", style=discord.ButtonStyle.grey,
@@ -335,33 +523,45 @@ class Giveaway(commands.Cog):
 
     # ── Reroll command ───────────────────────────────────────────────
 
-    @app_commands.command(name="giveaway_reroll", description="Re-pick a new winner from the last giveaway")
-    async def reroll_giveaway(self, interaction: discord.Interaction):
+    @app_commands.command(name="giveaway_reroll", description="Re-pick new winners from an ended giveaway")
+    @app_commands.describe(giveaway_id="Message ID of the giveaway", count="Number of new winners (default 1)")
+    @app_commands.autocomplete(giveaway_id=_ended_autocomplete)
+    async def reroll_giveaway(self, interaction: discord.Interaction, giveaway_id: str, count: int = 1):
         if not is_admin(interaction.user):
             await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
             return
 
-        if self.last_giveaway is None:
-            await interaction.response.send_message("There is no previous giveaway to reroll.", ephemeral=True)
+        giveaway = self.ended_giveaways.get(parse_giveaway_id(giveaway_id))
+        if giveaway is None:
+            await interaction.response.send_message("There is no ended giveaway with that ID.", ephemeral=True)
             return
 
-        participants = self.last_giveaway["participants"]
+        if count < 1:
+            await interaction.response.send_message("Winner count must be at least 1.", ephemeral=True)
+            return
+
+        participants = giveaway["participants"]
         if not participants:
-            await interaction.response.send_message("The last giveaway had no participants.", ephemeral=True)
+            await interaction.response.send_message("That giveaway had no participants.", ephemeral=True)
             return
 
-        winner_ids = pick_winners(participants, 1)
-        winner_id = winner_ids[0]
-        member = interaction.guild.get_member(winner_id)
-        winner_mention = member.mention if member else f"<@{winner_id}>"
+        # Drawn winners are excluded, so a reroll always picks someone new
+        winner_ids = participants.draw(count)
+        if not winner_ids:
+            await interaction.response.send_message("Every participant has already won.", ephemeral=True)
+            return
+        await self._save_state()
+
+        winner_mention = ", ".join(mention_winners(interaction.guild, winner_ids))
+        label = "winner" if len(winner_ids) == 1 else "winners"
 
-        channel = self.bot.get_channel(self.last_giveaway["channel_id"])
+        channel = self.bot.get_channel(giveaway["channel_id"])
         if channel:
             await channel.send(
-                f"🎰 **Giveaway Reroll** — The new winner for **{self.last_giveaway['prize']}** is {winner_mention}! Congratulations! 🎊"
+                f"🎰 **Giveaway Reroll** — The new {label} for **{giveaway['prize']}**: {winner_mention}! Congratulations! 🎊"
             )
 
-        await interaction.response.send_message(f"Rerolled! New winner: {winner_mention}", ephemeral=True)
+        await interaction.response.send_message(f"Rerolled! New {label}: {winner_mention}", ephemeral=True)
 
 
 async def setup(bot):
@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from config import is_admin
+from config import CHANNEL_MULTI_ROLES, CHANNEL_NAMES, is_admin
 
 
 class Info(commands.Cog):
@@ -9,7 +9,7 @@ class Info(commands.Cog):
         self.bot = bot
 
     async def _send_info_embed(self, guild):
-        channel = discord.utils.get(guild.text_channels, name="command")
+        channel = self.bot.channel_registry.get(guild, "commands")
 
         if not channel:
             overwrites = {
@@ -17,10 +17,11 @@ class Info(commands.Cog):
                 guild.me: discord.PermissionOverwrite(send_messages=True)
             }
             try:
-                channel = await guild.create_text_channel("command", overwrites=overwrites)
-                print(f"Created 'command' channel in {guild.name}")
+                channel = await guild.create_text_channel(CHANNEL_NAMES["commands"][0], overwrites=overwrites)
+                self.bot.channel_registry.assign("commands", channel)
+                print(f"Created '{channel.name}' channel in {guild.name}")
             except Exception as e:
-                print(f"Failed to create 'command' channel in {guild.name}: {e}")
+                print(f"Failed to create commands channel in {guild.name}: {e}")
                 return
 
         if channel:
@@ -83,5 +84,36 @@ class Info(commands.Cog):
         await self._send_info_embed(interaction.guild)
         await interaction.followup.send("Commands info panel has been set up!", ephemeral=True)
 
+    @app_commands.command(name="set_channel", description="Choose the channel a bot feature uses")
+    @app_commands.describe(role="The feature", channel="The channel it should use")
+    @app_commands.choices(role=[app_commands.Choice(name=role, value=role) for role in CHANNEL_NAMES])
+    async def set_channel(self, interaction: discord.Interaction, role: str, channel: discord.TextChannel):
+        if not is_admin(interaction.user):
+            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+            return
+
+        self.bot.channel_registry.assign(role, channel)
+        if role in CHANNEL_MULTI_ROLES:
+            await interaction.response.send_message(f"{channel.mention} is now also a {role} channel.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"The {role} channel is now {channel.mention}.", ephemeral=True)
+
+    @app_commands.command(name="unset_channel", description="Stop a bot feature from using a channel")
+    @app_commands.describe(role="The feature", channel="The channel it should stop using")
+    @app_commands.choices(role=[app_commands.Choice(name=role, value=role) for role in CHANNEL_NAMES])
+    async def unset_channel(self, interaction: discord.Interaction, role: str, channel: discord.TextChannel):
+        if not is_admin(interaction.user):
+            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+            return
+
+        if not self.bot.channel_registry.has_role(channel, role):
+            await interaction.response.send_message(f"{channel.mention} is not a {role} channel.", ephemeral=True)
+            return
+        self.bot.channel_registry.unassign(interaction.guild, role, channel.id)
+        note = ""
+        if channel.name in CHANNEL_NAMES[role]:
+            note = " Rename it as well, or it is picked up again by its name after a restart."
+        await interaction.response.send_message(f"{channel.mention} is no longer a {role} channel.{note}", ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(Info(bot))
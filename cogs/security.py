@@ -1,62 +1,190 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import datetime
-from config import is_admin
+import asyncio
+from datetime import timedelta
+from config import (
+    FILTER_BLOCK_INVITES, FILTER_DOMAINS_PATH, FILTER_PHRASES_PATH, FILTER_RELOAD_INTERVAL,
+    MOD_ACTION_BURST, MOD_ACTIONS_PER_SECOND, MOD_ESCALATION, MOD_NOTICE_DELAY, MOD_OFFENCE_TTL,
+    RAID_ACTION, RAID_EXIT_THRESHOLD, RAID_JOIN_THRESHOLD, RAID_MIN_LOCKDOWN, RAID_NEW_ACCOUNT_DAYS,
+    RAID_SIGNAL_WEIGHT, RAID_WINDOW,
+    SPAM_DUPLICATE_WINDOW, SPAM_MASS_DUPLICATE_USERS, SPAM_MAX_CHANNELS, SPAM_MAX_DUPLICATES,
+    SPAM_MAX_FINGERPRINTS, SPAM_MAX_MEMBERS, SPAM_MAX_MESSAGES, SPAM_MIN_FINGERPRINT_LENGTH, SPAM_WINDOW,
+    is_admin,
+)
+from utils.content_filter import ContentFilter, blocklist_mtimes
+from utils.moderation import ModerationQueue
+from utils.purge import ChannelPurger, replace_channel
+from utils.raid import RaidDetector, suspicion_signals
+from utils.spam import SpamEngine
 
 
 class Security(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # 5 messages per 5 seconds
-        self.spam_cd = commands.CooldownMapping.from_cooldown(5, 5.0, commands.BucketType.member)
+        self.spam = SpamEngine(
+            SPAM_WINDOW, SPAM_MAX_MESSAGES, SPAM_DUPLICATE_WINDOW, SPAM_MAX_DUPLICATES, SPAM_MAX_CHANNELS,
+            SPAM_MASS_DUPLICATE_USERS, SPAM_MIN_FINGERPRINT_LENGTH, SPAM_MAX_MEMBERS, SPAM_MAX_FINGERPRINTS,
+        )
+        self.moderation = ModerationQueue(
+            MOD_ESCALATION, MOD_OFFENCE_TTL, MOD_ACTIONS_PER_SECOND, MOD_ACTION_BURST, MOD_NOTICE_DELAY,
+        )
+        self.purger = ChannelPurger()
+        self._resume_task: asyncio.Task | None = None
+        self.content_filter = ContentFilter(block_invites=FILTER_BLOCK_INVITES)
+        self._filter_mtimes: tuple[float, ...] = ()
+        self._filter_task: asyncio.Task | None = None
+        self.raid = RaidDetector(
+            RAID_WINDOW, RAID_JOIN_THRESHOLD, RAID_EXIT_THRESHOLD, RAID_MIN_LOCKDOWN, RAID_SIGNAL_WEIGHT,
+        )
+        self._raid_task: asyncio.Task | None = None
+
+    async def cog_load(self):
+        self.moderation.start()
+        self.bot.message_router.add_global(self.handle_message)
+        self._resume_task = asyncio.create_task(self._resume_purges())
+        self._filter_task = asyncio.create_task(self._watch_blocklists())
+        self._raid_task = asyncio.create_task(self._expire_lockdowns())
+
+    async def cog_unload(self):
+        self.bot.message_router.remove(self.handle_message)
+        await self.moderation.close()
+        for task in (self._resume_task, self._filter_task, self._raid_task):
+            if task:
+                task.cancel()
+        await self.purger.close()
+
+    async def _watch_blocklists(self):
+        # Automata are built in a worker thread and swapped in whole, so the
+        # event loop never pays for a rebuild and never sees a half-built filter
+        while True:
+            try:
+                mtimes = await asyncio.to_thread(blocklist_mtimes, FILTER_PHRASES_PATH, FILTER_DOMAINS_PATH)
+                if mtimes != self._filter_mtimes:
+                    self.content_filter = await asyncio.to_thread(
+                        ContentFilter.from_files, FILTER_PHRASES_PATH, FILTER_DOMAINS_PATH, FILTER_BLOCK_INVITES,
+                    )
+                    self._filter_mtimes = mtimes
+                    print(f"Loaded content filter: {len(self.content_filter)} blocked phrase(s) and domain(s)")
+            except Exception as e:
+                print(f"Failed to reload blocklists: {e}")
+            await asyncio.sleep(FILTER_RELOAD_INTERVAL)
+
+    async def _resume_purges(self):
+        # Purges interrupted by a restart continue from their checkpoint
+        await self.bot.wait_until_ready()
+        for channel_id in self.purger.pending():
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                await self.purger.forget(channel_id)
+                continue
+            print(f"Resuming purge of #{channel.name}")
+            self.purger.resume(channel)
+
+    # ── Join raids ───────────────────────────────────────────────────
 
     @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
+    async def on_member_join(self, member: discord.Member):
+        if member.bot:
             return
+        was_locked = self.raid.in_lockdown(member.guild.id)
+        signals = suspicion_signals(member, timedelta(days=RAID_NEW_ACCOUNT_DAYS))
+        suspects = self.raid.observe(member, signals)
+        if not was_locked and self.raid.in_lockdown(member.guild.id):
+            print(f"Join raid detected in {member.guild.name}: lockdown on, suspect welcomes paused")
+        for suspect in suspects:
+            self.moderation.act(suspect, RAID_ACTION, "Suspected join raid account")
+
+    def welcome_blocked(self, member: discord.Member) -> bool:
+        """Whether ``member`` should go unwelcomed: a suspected account joining during a lockdown."""
+        return (
+            self.raid.in_lockdown(member.guild.id)
+            and suspicion_signals(member, timedelta(days=RAID_NEW_ACCOUNT_DAYS)) > 0
+        )
 
-        # Simple spam detection
-        bucket = self.spam_cd.get_bucket(message)
-        retry_after = bucket.update_rate_limit()
+    async def _expire_lockdowns(self):
+        while True:
+            await asyncio.sleep(RAID_WINDOW / 2)
+            for guild_id in self.raid.expire():
+                guild = self.bot.get_guild(guild_id)
+                print(f"Join rate in {guild.name if guild else guild_id} back to normal: lockdown lifted")
 
-        if retry_after:
+    async def handle_message(self, message):
+        if message.author.bot or message.guild is None:
+            return
+
+        blocked = None if is_admin(message.author) else self.content_filter.check(message.content)
+        if blocked:
             try:
-                # Timeout for 60 seconds
-                await message.author.timeout(datetime.timedelta(seconds=60), reason="Spamming")
-                await message.channel.send(f"{message.author.mention}, you have been timed out for 60 seconds for spamming!", delete_after=5)
-            except discord.Forbidden:
-                print(f"Could not timeout {message.author}: Missing permissions")
-            except Exception as e:
-                print(f"Error timing out {message.author}: {e}")
+                await message.delete()
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                print(f"Could not delete filtered message from {message.author}: {e}")
+            # Scam links usually come from compromised accounts, so they count as offences
+            if blocked.startswith("blocked link"):
+                self.moderation.punish(message.author, message.channel, blocked)
+            return
+
+        reason = self.spam.observe(message.guild.id, message.author.id, message.channel.id, message.content)
+        # Only the first hit of a burst queues an action; later ones are dropped
+        if reason and self.moderation.punish(message.author, message.channel, reason):
+            self.spam.forget(message.guild.id, message.author.id)
 
     @app_commands.command(name="delete", description="Delete all messages in this channel")
-    async def delete(self, interaction: discord.Interaction):
+    @app_commands.describe(mode="fast recreates the channel; bulk deletes messages and keeps the channel")
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="bulk (keep channel)", value="bulk"),
+        app_commands.Choice(name="fast (recreate channel)", value="fast"),
+    ])
+    async def delete(self, interaction: discord.Interaction, mode: str = "bulk"):
         if not is_admin(interaction.user):
             await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
             return
 
-        view = DeleteConfirmView(interaction.channel)
-        await interaction.response.send_message(
-            "Are you sure you want to **delete ALL messages** in this channel? This cannot be undone.",
-            view=view,
-            ephemeral=True,
-        )
+        if mode == "fast" and not isinstance(interaction.channel, discord.TextChannel):
+            await interaction.response.send_message("Fast mode only works in text channels.", ephemeral=True)
+            return
+        if mode == "bulk" and self.purger.is_running(interaction.channel.id):
+            await interaction.response.send_message("Messages in this channel are already being deleted.", ephemeral=True)
+            return
+
+        if mode == "fast":
+            prompt = (
+                "Are you sure you want to **delete ALL messages** in this channel? This cannot be undone.\n"
+                "The channel will be recreated with the same settings and permissions; "
+                "pins, threads and webhooks are lost and its ID changes."
+            )
+        else:
+            prompt = "Are you sure you want to **delete ALL messages** in this channel? This cannot be undone."
+        view = DeleteConfirmView(self, interaction.channel, mode)
+        await interaction.response.send_message(prompt, view=view, ephemeral=True)
 
 
 class DeleteConfirmView(discord.ui.View):
-    def __init__(self, channel: discord.TextChannel):
+    def __init__(self, cog: Security, channel: discord.abc.Messageable, mode: str):
         super().__init__(timeout=15)
+        self.cog = cog
         self.channel = channel
+        self.mode = mode
 
     @discord.ui.button(label="Confirm Delete", style=discord.ButtonStyle.danger)
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
         await interaction.response.edit_message(content="Deleting all messages...", view=None)
         try:
-            await self.channel.purge(limit=None)
+            if self.mode == "fast":
+                # The clone takes over the old channel's roles (welcome, ai, ...)
+                registry = self.cog.bot.channel_registry
+                roles = registry.roles_of(self.channel.id)
+                clone = await replace_channel(self.channel, f"Channel wiped by {interaction.user}")
+                for role in roles:
+                    registry.assign(role, clone)
+                await clone.send(f"🧹 Channel wiped by {interaction.user.mention}.")
+            else:
+                await self.cog.purger.start(self.channel, interaction.user.id)
         except Exception as e:
             await interaction.followup.send(f"Failed to delete messages: {e}", ephemeral=True)
-        self.stop()
 
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
     async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
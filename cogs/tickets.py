@@ -2,12 +2,31 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import asyncio
-from config import ADMIN_ROLE_ID, STAFF_ROLE_ID, TICKET_CATEGORY_ID, PAY_CATEGORY_ID, is_admin
+import time
+from config import (
+    ADMIN_ROLE_ID, CHANNEL_NAMES, STAFF_ROLE_ID, TICKET_CATEGORY_ID, PAY_CATEGORY_ID, TICKET_CATEGORY_LIMIT,
+    TICKET_POOL_SIZE, TICKET_CLOSE_GRACE, TICKET_DELETE_INTERVAL, is_admin,
+)
+from utils.scheduler import DeadlineScheduler
+from utils.ticket_store import TicketStore
+from utils.transcript_index import TranscriptIndex
+from utils.transcripts import TranscriptArchiver
+
+TICKET_CATEGORY_IDS = (TICKET_CATEGORY_ID, PAY_CATEGORY_ID)
+
+
+def ticket_owner(channel: discord.TextChannel) -> int | None:
+    """The member a ticket channel was opened for, read from its overwrites."""
+    for target, overwrite in channel.overwrites.items():
+        if isinstance(target, discord.Member) and not target.bot and overwrite.view_channel:
+            return target.id
+    return None
 
 
 class TicketView(discord.ui.View):
-    def __init__(self):
+    def __init__(self, cog: "Tickets"):
         super().__init__(timeout=None)
+        self.cog = cog
 
     @discord.ui.button(label="Open Ticket", style=discord.ButtonStyle.primary, emoji="📩", custom_id="ticket_create_btn")
     async def create_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -19,46 +38,34 @@ class TicketView(discord.ui.View):
              return
 
         # Check if user already has an open ticket
+        existing = self.cog.find_ticket(guild, interaction.user.id)
+        if existing:
+            await interaction.response.send_message(f"You already have an open ticket: {existing.mention}", ephemeral=True)
+            return
+
         category = guild.get_channel(TICKET_CATEGORY_ID)
         if not category or not isinstance(category, discord.CategoryChannel):
             await interaction.response.send_message("Ticket category not found.", ephemeral=True)
             return
 
-        channel_name = f"ticket-{interaction.user.name}"
-
-        for ch in category.text_channels:
-            if ch.name == channel_name:
-                await interaction.response.send_message(f"You already have an open ticket: {ch.mention}", ephemeral=True)
-                return
-
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-            staff_role: discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        }
-
-        admin_role = guild.get_role(ADMIN_ROLE_ID)
-        if admin_role:
-            overwrites[admin_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-
+        # Channel creation can outlast the 3 second interaction deadline
+        await interaction.response.defer(ephemeral=True, thinking=True)
         try:
-            channel = await guild.create_text_channel(channel_name, category=category, overwrites=overwrites)
-            await interaction.response.send_message(f"Ticket created: {channel.mention}", ephemeral=True)
-
-            embed = discord.Embed(
-                title="Ticket Created",
-                description=f"Welcome {interaction.user.mention}!\nSupport will be with you shortly.",
-                color=0x3ba55c
-            )
-            await channel.send(embed=embed, view=TicketCloseView())
-
+            channel, created = await self.cog.open_ticket(interaction.user, category, staff_role)
         except Exception as e:
-            await interaction.response.send_message(f"Failed to create ticket: {e}", ephemeral=True)
+            await interaction.followup.send(f"Failed to create ticket: {e}", ephemeral=True)
+            return
+
+        if created:
+            await interaction.followup.send(f"Ticket created: {channel.mention}", ephemeral=True)
+        else:
+            await interaction.followup.send(f"You already have an open ticket: {channel.mention}", ephemeral=True)
 
 
 class TicketCloseView(discord.ui.View):
-    def __init__(self):
+    def __init__(self, cog: "Tickets"):
         super().__init__(timeout=None)
+        self.cog = cog
 
     @discord.ui.button(label="Close Ticket", style=discord.ButtonStyle.danger, emoji="🔒", custom_id="ticket_close_btn")
     async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -66,21 +73,361 @@ class TicketCloseView(discord.ui.View):
             await interaction.response.send_message("Only staff/admins can close tickets.", ephemeral=True)
             return
 
-        await interaction.response.send_message("Ticket will be deleted in 5 seconds...")
-        await asyncio.sleep(5)
-        try:
-            await interaction.channel.delete(reason=f"Ticket closed by {interaction.user}")
-        except Exception as e:
-            print(f"Failed to delete ticket channel: {e}")
+        due = self.cog.begin_close(interaction.channel, interaction.user)
+        if due is None:
+            await interaction.response.send_message("This ticket is already being closed.", ephemeral=True)
+            return
+
+        await interaction.response.send_message(
+            f"🔒 Ticket closed by {interaction.user.mention}. It will be archived and deleted <t:{int(due)}:R>.",
+            view=TicketReopenView(self.cog),
+        )
+
+
+class TicketReopenView(discord.ui.View):
+    def __init__(self, cog: "Tickets"):
+        super().__init__(timeout=None)
+        self.cog = cog
+
+    @discord.ui.button(label="Cancel Close", style=discord.ButtonStyle.secondary, emoji="↩️", custom_id="ticket_close_cancel_btn")
+    async def cancel_close(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if not is_admin(interaction.user):
+            await interaction.response.send_message("Only staff/admins can reopen tickets.", ephemeral=True)
+            return
+
+        if not self.cog.cancel_close(interaction.channel.id):
+            await interaction.response.send_message("Too late, this ticket is already being archived.", ephemeral=True)
+            return
+
+        await interaction.response.edit_message(content=f"↩️ Close cancelled by {interaction.user.mention}.", view=None)
 
 
 class Tickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.store = TicketStore()
+        self._index_built = False
+        self.archiver = TranscriptArchiver()
+        self.search_index = TranscriptIndex()
+        # In-flight ticket creations by user ID; repeat clicks await the same task
+        self._creating: dict[int, asyncio.Task] = {}
+        # Closes wait out their grace period here, then deletes go through one rate-limited worker
+        self.close_scheduler = DeadlineScheduler(self._on_close_due)
+        self._deletions: asyncio.Queue[int] = asyncio.Queue()
+        self._deletion_worker_task: asyncio.Task | None = None
+        # Channel slots taken by in-flight creates/moves, per category ID
+        self._reserved: dict[int, int] = {}
+        self._overflow_locks: dict[int, asyncio.Lock] = {}
+        self._refill_task: asyncio.Task | None = None
 
     async def cog_load(self):
-        self.bot.add_view(TicketView())
-        self.bot.add_view(TicketCloseView())
+        self.bot.add_view(TicketView(self))
+        self.bot.add_view(TicketCloseView(self))
+        self.bot.add_view(TicketReopenView(self))
+
+        # Resume closes interrupted by a restart
+        for channel_id, close in self.store.pending_closes().items():
+            if close["archived"]:
+                self._deletions.put_nowait(channel_id)
+            else:
+                self.close_scheduler.schedule(channel_id, close["due"])
+        self.close_scheduler.start()
+        self._deletion_worker_task = asyncio.create_task(self._deletion_worker())
+
+    async def cog_unload(self):
+        # Pending closes are persisted; interrupted archives leave no partial file
+        self.close_scheduler.stop()
+        if self._deletion_worker_task and not self._deletion_worker_task.done():
+            self._deletion_worker_task.cancel()
+        if self._refill_task and not self._refill_task.done():
+            self._refill_task.cancel()
+        await self.store.flush()
+        self.search_index.close()
+
+    # ── Ownership index ──────────────────────────────────────────────
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if self._index_built:
+            return
+        self._index_built = True
+
+        self.store.prune(lambda channel_id: self.bot.get_channel(channel_id) is not None)
+        # Pick up tickets opened before the index existed
+        for guild in self.bot.guilds:
+            for category in guild.categories:
+                if not self._is_ticket_category(category.id):
+                    continue
+                for channel in category.text_channels:
+                    self._index_channel(channel)
+        print(f"Ticket index ready: {len(self.store)} open ticket(s)")
+        self._schedule_pool_refill()
+
+    def _is_ticket_category(self, category_id: int | None) -> bool:
+        return category_id in TICKET_CATEGORY_IDS or self.store.base_category(category_id) is not None
+
+    def _index_channel(self, channel: discord.abc.GuildChannel):
+        if not isinstance(channel, discord.TextChannel) or not self._is_ticket_category(channel.category_id):
+            return
+        if self.store.owner_of(channel.id) is not None or self.store.is_pool_channel(channel.id):
+            return
+        owner_id = ticket_owner(channel)
+        if owner_id is not None and self.store.channel_for(owner_id) is None:
+            self.store.set_owner(owner_id, channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        self._index_channel(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.store.discard_channel(channel.id)
+
+    def find_ticket(self, guild: discord.Guild, user_id: int) -> discord.TextChannel | None:
+        channel_id = self.store.channel_for(user_id)
+        if channel_id is None:
+            return None
+        channel = guild.get_channel(channel_id)
+        if channel is None:
+            # Deleted while we were offline
+            self.store.discard_channel(channel_id)
+        return channel
+
+    # ── Creation ─────────────────────────────────────────────────────
+
+    async def open_ticket(self, member: discord.Member, category: discord.CategoryChannel,
+                          staff_role: discord.Role) -> tuple[discord.TextChannel, bool]:
+        """Return the member's ticket channel and whether this call created it."""
+        existing = self.find_ticket(member.guild, member.id)
+        if existing:
+            return existing, False
+
+        task = self._creating.get(member.id)
+        if task is not None:
+            return await asyncio.shield(task), False
+
+        task = asyncio.create_task(self._create_ticket_channel(member, category, staff_role))
+        self._creating[member.id] = task
+        task.add_done_callback(lambda _: self._creating.pop(member.id, None))
+        return await asyncio.shield(task), True
+
+    @staticmethod
+    def _ticket_overwrites(member: discord.Member, staff_role: discord.Role) -> dict:
+        guild = member.guild
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(view_channel=False),
+            guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True),
+            member: discord.PermissionOverwrite(view_channel=True, send_messages=True),
+            staff_role: discord.PermissionOverwrite(view_channel=True, send_messages=True)
+        }
+
+        admin_role = guild.get_role(ADMIN_ROLE_ID)
+        if admin_role:
+            overwrites[admin_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+        return overwrites
+
+    async def _create_ticket_channel(self, member: discord.Member, category: discord.CategoryChannel,
+                                     staff_role: discord.Role) -> discord.TextChannel:
+        name = f"ticket-{member.name}"
+        overwrites = self._ticket_overwrites(member, staff_role)
+
+        channel = await self._claim_pool_channel(member.guild, name, overwrites)
+        if channel is None:
+            target = await self._reserve_slot(category)
+            try:
+                channel = await member.guild.create_text_channel(name, category=target, overwrites=overwrites)
+            finally:
+                self._release_slot(target)
+        self.store.set_owner(member.id, channel.id)
+
+        embed = discord.Embed(
+            title="Ticket Created",
+            description=f"Welcome {member.mention}!\nSupport will be with you shortly.",
+            color=0x3ba55c
+        )
+        await channel.send(embed=embed, view=TicketCloseView(self))
+        return channel
+
+    # ── Category overflow ────────────────────────────────────────────
+
+    def _has_room(self, category: discord.CategoryChannel) -> bool:
+        return len(category.channels) + self._reserved.get(category.id, 0) < TICKET_CATEGORY_LIMIT
+
+    async def _reserve_slot(self, base: discord.CategoryChannel) -> discord.CategoryChannel:
+        """Reserve a channel slot in ``base`` or one of its overflow categories.
+
+        Overflow categories are created on demand next to ``base`` with the
+        same overwrites. Every reservation must be paired with ``_release_slot``.
+        """
+        category = self._find_room(base)
+        if category is None:
+            async with self._overflow_locks.setdefault(base.id, asyncio.Lock()):
+                # Another caller may have created one while we waited
+                category = self._find_room(base)
+                if category is None:
+                    number = len(self.store.overflow_categories(base.id)) + 2
+                    category = await base.guild.create_category(
+                        f"{base.name} {number}", overwrites=base.overwrites, position=base.position + 1,
+                        reason="Ticket category is full",
+                    )
+                    self.store.add_overflow_category(base.id, category.id)
+                    print(f"Created overflow category {category.name} for {base.name}")
+
+        self._reserved[category.id] = self._reserved.get(category.id, 0) + 1
+        return category
+
+    def _find_room(self, base: discord.CategoryChannel) -> discord.CategoryChannel | None:
+        if self._has_room(base):
+            return base
+        for category_id in self.store.overflow_categories(base.id):
+            category = base.guild.get_channel(category_id)
+            if isinstance(category, discord.CategoryChannel) and self._has_room(category):
+                return category
+        return None
+
+    def _release_slot(self, category: discord.CategoryChannel):
+        remaining = self._reserved.get(category.id, 0) - 1
+        if remaining > 0:
+            self._reserved[category.id] = remaining
+        else:
+            self._reserved.pop(category.id, None)
+
+    # ── Warm channel pool ────────────────────────────────────────────
+
+    async def _claim_pool_channel(self, guild: discord.Guild, name: str,
+                                  overwrites: dict) -> discord.TextChannel | None:
+        """Turn a pre-created hidden channel into a ticket with a single edit."""
+        while (channel_id := self.store.pop_pool_channel()) is not None:
+            channel = guild.get_channel(channel_id)
+            if not isinstance(channel, discord.TextChannel):
+                continue
+            try:
+                await channel.edit(name=name, overwrites=overwrites)
+            except discord.NotFound:
+                continue
+            self._schedule_pool_refill()
+            return channel
+        self._schedule_pool_refill()
+        return None
+
+    def _schedule_pool_refill(self):
+        if TICKET_POOL_SIZE <= 0:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill_pool())
+
+    async def _refill_pool(self):
+        base = self.bot.get_channel(TICKET_CATEGORY_ID)
+        if not isinstance(base, discord.CategoryChannel):
+            return
+        guild = base.guild
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(view_channel=False),
+            guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True),
+        }
+        while self.store.pool_size < TICKET_POOL_SIZE:
+            category = await self._reserve_slot(base)
+            try:
+                channel = await guild.create_text_channel(
+                    "ticket-pool", category=category, overwrites=overwrites, reason="Ticket pool refill",
+                )
+            except discord.HTTPException as e:
+                print(f"Failed to refill ticket pool: {e}")
+                return
+            finally:
+                self._release_slot(category)
+            self.store.add_pool_channel(channel.id)
+
+    # ── Closing ──────────────────────────────────────────────────────
+
+    @property
+    def deletion_queue_depth(self) -> int:
+        return self._deletions.qsize()
+
+    def begin_close(self, channel: discord.TextChannel, closed_by: discord.Member) -> float | None:
+        """Schedule ``channel`` for archiving and deletion; returns the due time."""
+        if self.store.get_close(channel.id) is not None:
+            return None
+        due = time.time() + TICKET_CLOSE_GRACE
+        self.store.add_close(channel.id, due, closed_by.id, str(closed_by))
+        self.close_scheduler.schedule(channel.id, due)
+        return due
+
+    def cancel_close(self, channel_id: int) -> bool:
+        """Abort a close that is still in its grace period."""
+        if not self.close_scheduler.cancel(channel_id):
+            return False
+        self.store.remove_close(channel_id)
+        return True
+
+    async def _on_close_due(self, channel_id: int):
+        await self.bot.wait_until_ready()
+        close = self.store.get_close(channel_id)
+        channel = self.bot.get_channel(channel_id)
+        if close is None or channel is None:
+            self.store.remove_close(channel_id)
+            return
+
+        header = {"owner_id": self.store.owner_of(channel_id), "closed_by": close["closed_by"]}
+        try:
+            path = await self.archiver.archive(channel, header)
+        except Exception as e:
+            print(f"Failed to archive ticket #{channel.name}: {e}")
+            self.store.remove_close(channel_id)
+            try:
+                await channel.send(f"Failed to save the transcript ({e}). The ticket was not deleted.")
+            except discord.HTTPException:
+                pass
+            return
+
+        self.store.mark_archived(channel_id)
+        try:
+            await asyncio.to_thread(self.search_index.index_transcript, path)
+        except Exception as e:
+            # The archive is safe on disk; /ticket_reindex will pick it up
+            print(f"Failed to index transcript {path}: {e}")
+
+        self._deletions.put_nowait(channel_id)
+
+    async def _deletion_worker(self):
+        await self.bot.wait_until_ready()
+        loop = asyncio.get_running_loop()
+        last_delete = 0.0
+        while True:
+            channel_id = await self._deletions.get()
+            delay = last_delete + TICKET_DELETE_INTERVAL - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self._delete_ticket_channel(channel_id)
+            except Exception as e:
+                print(f"Ticket deletion worker error for {channel_id}: {e}")
+            last_delete = loop.time()
+
+    async def _delete_ticket_channel(self, channel_id: int, attempts: int = 5):
+        close = self.store.get_close(channel_id) or {}
+        reason = f"Ticket closed by {close.get('closed_by_name', 'staff')}"
+        for attempt in range(attempts):
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                break
+            try:
+                await channel.delete(reason=reason)
+                break
+            except discord.NotFound:
+                break
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    # Permanent failure; keep the entry so the next start retries
+                    print(f"Failed to delete ticket channel {channel_id}: {e}")
+                    return
+                backoff = 2 ** attempt
+                print(f"Deleting ticket channel {channel_id} failed ({e.status}), retrying in {backoff}s")
+                await asyncio.sleep(backoff)
+        else:
+            print(f"Giving up on deleting ticket channel {channel_id} until next start")
+            return
+        self.store.remove_close(channel_id)
 
     @app_commands.command(name="setup_tickets", description="Create the ticket support panel")
     async def setup_tickets(self, interaction: discord.Interaction):
@@ -95,16 +442,11 @@ class Tickets(commands.Cog):
             await interaction.followup.send("Ticket category not found.", ephemeral=True)
             return
 
-        target_name = "🎫｜tickets"
-        channel = None
-
-        for c in category.text_channels:
-            if c.name == target_name or "tickets" in c.name:
-                channel = c
-                break
+        channel = self.bot.channel_registry.get(interaction.guild, "tickets")
 
         if not channel:
-            channel = await category.create_text_channel(target_name)
+            channel = await category.create_text_channel(CHANNEL_NAMES["tickets"][0])
+            self.bot.channel_registry.assign("tickets", channel)
             await interaction.followup.send(f"Created ticket panel channel: {channel.mention}", ephemeral=True)
         else:
             await interaction.followup.send(f"Using existing ticket panel channel: {channel.mention}", ephemeral=True)
@@ -126,7 +468,7 @@ class Tickets(commands.Cog):
             )
             embed.set_thumbnail(url=interaction.guild.icon.url if interaction.guild.icon else None)
             embed.set_footer(text="Smart Store • Click below to get started")
-            await channel.send(embed=embed, view=TicketView())
+            await channel.send(embed=embed, view=TicketView(self))
         else:
             await interaction.followup.send("Error: Could not verify ticket channel.", ephemeral=True)
 
@@ -141,16 +483,81 @@ class Tickets(commands.Cog):
             return
 
         try:
-            category = interaction.guild.get_channel(PAY_CATEGORY_ID)
-            if not category or not isinstance(category, discord.CategoryChannel):
+            base = interaction.guild.get_channel(PAY_CATEGORY_ID)
+            if not base or not isinstance(base, discord.CategoryChannel):
                 await interaction.response.send_message("PAY category not found.", ephemeral=True)
                 return
 
-            await interaction.channel.edit(category=category)
+            current = interaction.channel.category_id
+            if PAY_CATEGORY_ID in (current, self.store.base_category(current)):
+                await interaction.response.send_message("This ticket is already in the PAY category.", ephemeral=True)
+                return
+
+            category = await self._reserve_slot(base)
+            try:
+                await interaction.channel.edit(category=category)
+            finally:
+                self._release_slot(category)
             await interaction.response.send_message(f"Ticket moved to {category.name}.")
 
         except Exception as e:
             await interaction.response.send_message(f"Failed to move ticket: {e}", ephemeral=True)
 
+    @app_commands.command(name="ticket_queue", description="Show pending ticket closes and deletions (Staff Only)")
+    async def ticket_queue(self, interaction: discord.Interaction):
+        if not is_admin(interaction.user):
+            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+            return
+
+        await interaction.response.send_message(
+            f"⏳ {len(self.close_scheduler)} ticket(s) in their close grace period, "
+            f"🗑️ {self.deletion_queue_depth} waiting for deletion.",
+            ephemeral=True,
+        )
+
+    @app_commands.command(name="ticket_search", description="Search archived ticket transcripts (Staff Only)")
+    @app_commands.describe(query="Words to search for", limit="Maximum number of results (default 10)")
+    async def ticket_search(self, interaction: discord.Interaction, query: str, limit: int = 10):
+        if not is_admin(interaction.user):
+            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+            return
+
+        limit = max(1, min(limit, 25))
+        start = time.perf_counter()
+        hits = await asyncio.to_thread(self.search_index.search, interaction.guild_id, query, limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if not hits:
+            await interaction.response.send_message(f"No transcripts match `{query}`.", ephemeral=True)
+            return
+
+        lines = []
+        for hit in hits:
+            ticket = hit["ticket"] or hit["channel_id"]
+            owner = f" (<@{hit['owner_id']}>)" if hit["owner_id"] else ""
+            lines.append(f"**{ticket}**{owner} — {hit['author']}, {hit['created_at'][:10]}\n> {hit['snippet']}")
+
+        embed = discord.Embed(
+            title=f"🔎 Ticket search: {query}"[:256],
+            description="\n\n".join(lines)[:4096],
+            color=0x2b2d31
+        )
+        embed.set_footer(text=f"{len(hits)} result(s) in {elapsed_ms:.1f} ms")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="ticket_reindex", description="Rebuild the ticket transcript search index (Admin Only)")
+    async def ticket_reindex(self, interaction: discord.Interaction):
+        if not is_admin(interaction.user):
+            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        start = time.perf_counter()
+        tickets, messages = await asyncio.to_thread(self.search_index.rebuild, self.archiver.path)
+        elapsed = time.perf_counter() - start
+        await interaction.followup.send(
+            f"Re-indexed {messages} message(s) from {tickets} transcript(s) in {elapsed:.1f}s.", ephemeral=True
+        )
+
 async def setup(bot):
     await bot.add_cog(Tickets(bot))
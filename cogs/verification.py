@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from config import VERIFY_ROLE_ID, is_admin
+from config import CHANNEL_NAMES, VERIFY_ROLE_ID, is_admin
 
 
 class VerifyView(discord.ui.View):
@@ -38,11 +38,11 @@ class Verification(commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
-        channel_name = "verify-✅"
-        channel = discord.utils.get(interaction.guild.channels, name=channel_name)
+        channel = self.bot.channel_registry.get(interaction.guild, "verify")
 
         if not channel:
-            channel = await interaction.guild.create_text_channel(channel_name)
+            channel = await interaction.guild.create_text_channel(CHANNEL_NAMES["verify"][0])
+            self.bot.channel_registry.assign("verify", channel)
             await interaction.followup.send(f"Created verification channel: {channel.mention}", ephemeral=True)
         else:
             await interaction.followup.send(f"Using existing verification channel: {channel.mention}", ephemeral=True)
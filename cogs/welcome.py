@@ -1,13 +1,37 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+import asyncio
+import time
+from collections import deque
 from datetime import datetime
-from config import is_admin
+from config import (
+    CHANNEL_NAMES, WELCOME_AVATAR_CACHE, WELCOME_BATCH_DELAY, WELCOME_BATCH_MENTIONS, WELCOME_BURST_JOINS,
+    WELCOME_BURST_WINDOW, WELCOME_CARD_BACKGROUNDS, WELCOME_CARD_FONT, WELCOME_CARD_PROCESSES,
+    WELCOME_CARD_WORKERS, WELCOME_CARDS, is_admin,
+)
+from utils.welcome_card import FILENAME, WelcomeCardRenderer
 
 
 class Welcome(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Per guild: recent join times, and members waiting for a combined welcome
+        self._recent_joins: dict[int, deque[float]] = {}
+        self._batches: dict[int, list[discord.Member]] = {}
+        self._batch_tasks: dict[int, asyncio.Task] = {}
+        self.cards = None
+        if WELCOME_CARDS:
+            self.cards = WelcomeCardRenderer(
+                WELCOME_CARD_WORKERS, WELCOME_AVATAR_CACHE, WELCOME_CARD_BACKGROUNDS, WELCOME_CARD_FONT,
+                WELCOME_CARD_PROCESSES,
+            )
+
+    async def cog_unload(self):
+        for task in self._batch_tasks.values():
+            task.cancel()
+        if self.cards:
+            self.cards.close()
 
     @app_commands.command(name="setup_welcome", description="Create the welcome channel")
     async def setup_welcome(self, interaction: discord.Interaction):
@@ -17,7 +41,7 @@ class Welcome(commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
-        channel = discord.utils.get(interaction.guild.text_channels, name="welcome")
+        channel = self.bot.channel_registry.get(interaction.guild, "welcome")
 
         if channel:
             await interaction.followup.send(f"Welcome channel already exists: {channel.mention}", ephemeral=True)
@@ -28,18 +52,91 @@ class Welcome(commands.Cog):
             interaction.guild.me: discord.PermissionOverwrite(send_messages=True)
         }
         try:
-            channel = await interaction.guild.create_text_channel("welcome", overwrites=overwrites)
+            channel = await interaction.guild.create_text_channel(CHANNEL_NAMES["welcome"][0], overwrites=overwrites)
+            self.bot.channel_registry.assign("welcome", channel)
             await interaction.followup.send(f"Created welcome channel: {channel.mention}", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"Failed to create welcome channel: {e}", ephemeral=True)
 
+    def _welcome_blocked(self, member: discord.Member) -> bool:
+        # During a join-raid lockdown Security holds back suspected accounts
+        security = self.bot.get_cog("Security")
+        return security is not None and security.welcome_blocked(member)
+
+    def _in_lockdown(self, guild_id: int) -> bool:
+        security = self.bot.get_cog("Security")
+        return security is not None and security.raid.in_lockdown(guild_id)
+
     @commands.Cog.listener()
     async def on_member_join(self, member):
-        channel = discord.utils.get(member.guild.text_channels, name="welcome")
+        if self._welcome_blocked(member):
+            return
+
+        channel = self.bot.channel_registry.get(member.guild, "welcome")
 
         if not channel:
             return
 
+        # Past WELCOME_BURST_JOINS per window, joins are welcomed in batches,
+        # so the messages sent grow with time instead of with the joins
+        guild_id = member.guild.id
+        now = time.monotonic()
+        recent = self._recent_joins.setdefault(guild_id, deque())
+        recent.append(now)
+        while recent[0] < now - WELCOME_BURST_WINDOW:
+            recent.popleft()
+
+        # A lockdown means a join flood, so the members still welcomed are always batched
+        if len(recent) > WELCOME_BURST_JOINS or guild_id in self._batches or self._in_lockdown(guild_id):
+            self._batches.setdefault(guild_id, []).append(member)
+            if guild_id not in self._batch_tasks:
+                self._batch_tasks[guild_id] = asyncio.create_task(self._flush_batch(member.guild))
+            return
+
+        await self._send_welcome(channel, member)
+
+    async def _flush_batch(self, guild: discord.Guild):
+        try:
+            await asyncio.sleep(WELCOME_BATCH_DELAY)
+        finally:
+            self._batch_tasks.pop(guild.id, None)
+            members = self._batches.pop(guild.id, [])
+
+        # Drop members who left or were removed meanwhile, and suspects if a lockdown began since they joined
+        members = [m for m in members if guild.get_member(m.id) and not self._welcome_blocked(m)]
+        channel = self.bot.channel_registry.get(guild, "welcome")
+        if not channel or not members:
+            return
+
+        if len(members) == 1:
+            await self._send_welcome(channel, members[0])
+            return
+
+        mentions = ", ".join(m.mention for m in members[:WELCOME_BATCH_MENTIONS])
+        others = len(members) - WELCOME_BATCH_MENTIONS
+        if others > 0:
+            mentions += f" and {others} other{'s' if others != 1 else ''}"
+        embed = discord.Embed(
+            description=(
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                f"Welcome {mentions} To **{guild.name}**!\n\n"
+                f"We Are Now **{guild.member_count}** Members!\n\n"
+                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+            ),
+            color=0x2b2d31
+        )
+        now = datetime.now().strftime("%m/%d/%Y %I:%M %p")
+        if guild.icon:
+            embed.set_thumbnail(url=guild.icon.url)
+            embed.set_footer(text=f"{guild.name} • {now}", icon_url=guild.icon.url)
+        else:
+            embed.set_footer(text=f"{guild.name} • {now}")
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            print(f"Failed to send combined welcome in {guild.name}: {e}")
+
+    async def _send_welcome(self, channel: discord.TextChannel, member: discord.Member):
         now = datetime.now().strftime("%m/%d/%Y %I:%M %p")
         member_count = member.guild.member_count
 
@@ -52,7 +149,16 @@ class Welcome(commands.Cog):
             ),
             color=0x2b2d31
         )
-        embed.set_thumbnail(url=member.display_avatar.url)
+        card = None
+        if self.cards:
+            try:
+                card = await self.cards.render(member)
+            except Exception as e:
+                print(f"Failed to render welcome card for {member}: {e}")
+        if card:
+            embed.set_image(url=f"attachment://{FILENAME}")
+        else:
+            embed.set_thumbnail(url=member.display_avatar.url)
         if member.guild.icon:
             embed.set_footer(text=f"{member.guild.name} • {now}", icon_url=member.guild.icon.url)
         else:
@@ -66,7 +172,10 @@ class Welcome(commands.Cog):
             disabled=True
         ))
 
-        await channel.send(embed=embed, view=view)
+        if card:
+            await channel.send(embed=embed, view=view, file=card)
+        else:
+            await channel.send(embed=embed, view=view)
 
 async def setup(bot):
     await bot.add_cog(Welcome(bot))
@@ -1,3 +1,5 @@
+import os
+
 import discord
 
 # Role IDs
@@ -9,6 +11,98 @@ VERIFY_ROLE_ID = 1472316348771078275
 TICKET_CATEGORY_ID = 1471769129156349952
 PAY_CATEGORY_ID = 1471769793433702462
 
+# Channels
+# Names a role's channel is recognised by until one is assigned with /set_channel;
+# the first name is used when the bot creates the channel
+CHANNEL_NAMES = {
+    "welcome": ("welcome",),
+    "ai": ("ai-chat", "ai-room"),
+    "commands": ("command",),
+    "giveaways": ("🎰｜giveaways", "giveaways", "giveaway"),
+    "verify": ("verify-✅",),
+    "tickets": ("🎫｜tickets", "tickets"),
+}
+CHANNEL_MULTI_ROLES = ("ai",)  # roles answered in every channel carrying one of their names
+
+# Tickets
+TICKET_CATEGORY_LIMIT = 50  # Discord's channel cap per category
+TICKET_POOL_SIZE = 0  # hidden pre-created ticket channels to keep ready (0 disables the pool)
+TICKET_CLOSE_GRACE = 10  # seconds staff have to cancel a close before archiving starts
+TICKET_DELETE_INTERVAL = 1.0  # min seconds between channel deletes by the deletion worker
+TRANSCRIPT_ATTACHMENT_CONCURRENCY = 4  # parallel attachment downloads per archive
+TRANSCRIPT_MAX_ATTACHMENT_BYTES = 25 * 1024 * 1024  # larger files are kept as URLs only
+TRANSCRIPT_ATTACHMENT_TIMEOUT = 300  # seconds an archive may spend on attachments before keeping URLs only
+
+# AI chat
+AI_STREAM = True  # stream replies and edit them as tokens arrive; long ones switch to embeds
+AI_STREAM_EDIT_INTERVAL = 1.2  # min seconds between edits of a streaming reply
+AI_MEMORY_TOKENS = 3000  # estimated tokens of history sent with each message
+AI_MEMORY_CHANNELS = 1000  # conversations kept in memory before the idlest is dropped
+AI_MEMORY_PER_THREAD = True  # threads get their own memory instead of sharing their channel's
+AI_MEMORY_IDLE = 900  # seconds of silence after which a conversation starts over (None never forgets)
+AI_CACHE_TTL = 3600  # seconds a cached reply to a repeated opening question stays valid
+AI_CACHE_MAX_ENTRIES = 2000
+AI_CACHE_MAX_BYTES = 4 * 1024 * 1024  # total cached reply text
+AI_CACHE_PATH = "data/ai_cache.json"  # None keeps the cache in memory only
+AI_MAX_CONCURRENCY = 4  # upstream completions in flight at once
+AI_MAX_QUEUE = 16  # requests allowed to wait for a slot before replying "busy"
+# Point at a local stand-in (benchmarks/mock_openai.py) to load-test without quota
+AI_BASE_URL = os.getenv("AI_BASE_URL", "https://openrouter.ai/api/v1")
+# Tried in order; an entry may set its own "base_url" to use another endpoint
+AI_MODELS = [
+    {"model": "stepfun/step-3.5-flash:free"},
+    {"model": "meta-llama/llama-3.3-70b-instruct:free"},
+]
+AI_HEDGE_PERCENTILE = 90  # hedge to the next model once the first token is later than this
+AI_HEDGE_MIN_DELAY = 1.0  # bounds on the adaptive hedge deadline, in seconds
+AI_HEDGE_MAX_DELAY = 8.0
+AI_BREAKER_FAILURES = 3  # consecutive failures before a model is skipped
+AI_BREAKER_COOLDOWN = 60  # seconds before a skipped model gets a trial request
+
+# Security
+SPAM_WINDOW = 5.0  # seconds of the per-member message rate window
+SPAM_MAX_MESSAGES = 5  # messages allowed per window; one more is spam
+SPAM_DUPLICATE_WINDOW = 30.0  # seconds repeated content is remembered
+SPAM_MAX_DUPLICATES = 3  # copies of one text a member may post per duplicate window
+SPAM_MAX_CHANNELS = 2  # channels one member may post the same text to
+SPAM_MASS_DUPLICATE_USERS = 5  # members posting the same text before it counts as a raid
+SPAM_MIN_FINGERPRINT_LENGTH = 12  # shorter messages ("ok", "lol") are never fingerprinted
+SPAM_MAX_MEMBERS = 50_000  # tracked members before the idlest are evicted
+SPAM_MAX_FINGERPRINTS = 100_000  # tracked texts before the idlest are evicted
+MOD_ESCALATION = [60, 600, None]  # timeout seconds for each repeat offence; None kicks
+MOD_OFFENCE_TTL = 3600  # seconds an offence counts toward escalation
+MOD_ACTIONS_PER_SECOND = 2.0  # sustained rate of timeouts, kicks and notices
+MOD_ACTION_BURST = 5
+MOD_NOTICE_DELAY = 3.0  # seconds notices are collected into one summary per channel
+FILTER_PHRASES_PATH = "data/blocked_phrases.txt"  # one phrase per line, # for comments
+FILTER_DOMAINS_PATH = "data/blocked_domains.txt"  # one domain per line; subdomains are blocked too
+FILTER_BLOCK_INVITES = True  # delete Discord invite links from non-admins
+FILTER_RELOAD_INTERVAL = 30  # seconds between checks for edited blocklists
+RAID_WINDOW = 10.0  # seconds of the per-guild join-rate window
+RAID_JOIN_THRESHOLD = 12  # weighted joins per window that start a lockdown
+RAID_EXIT_THRESHOLD = 3  # lockdown ends once weighted joins per window fall below this
+RAID_MIN_LOCKDOWN = 120  # seconds a lockdown lasts at least
+RAID_NEW_ACCOUNT_DAYS = 7  # accounts younger than this are a suspicion signal
+RAID_SIGNAL_WEIGHT = 1.0  # extra join weight per signal (new account, default avatar)
+RAID_ACTION = 3600  # timeout seconds for suspected raid accounts; None kicks them
+
+# Welcome
+WELCOME_BURST_WINDOW = 10.0  # seconds of the join-rate window
+WELCOME_BURST_JOINS = 5  # joins per window above which welcomes are batched
+WELCOME_BATCH_DELAY = 5.0  # seconds joins are collected into one combined welcome
+WELCOME_BATCH_MENTIONS = 10  # members mentioned by name in a combined welcome
+WELCOME_CARDS = True  # attach a rendered welcome card image (needs Pillow)
+WELCOME_CARD_WORKERS = 2
+WELCOME_CARD_PROCESSES = True  # render in worker processes; False uses threads
+WELCOME_CARD_BACKGROUNDS = "assets/welcome"  # <guild_id>.png, else default.png, else a gradient
+WELCOME_CARD_FONT = None  # path to a .ttf; None uses Pillow's bundled font
+WELCOME_AVATAR_CACHE = 512  # downloaded avatars kept, keyed by avatar hash
+
+# Giveaways
+GIVEAWAY_EDIT_INTERVAL = 5.0  # min seconds between participant-count embed edits
+GIVEAWAY_JOURNAL_FLUSH_INTERVAL = 0.5  # seconds joins are batched before one fsync
+GIVEAWAY_HISTORY_SIZE = 25  # ended giveaways kept for /giveaway_reroll
+
 
 def is_admin(user: discord.Member) -> bool:
     role_ids = {r.id for r in user.roles}
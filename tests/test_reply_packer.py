@@ -0,0 +1,139 @@
+import random
+import re
+
+import pytest
+
+from utils.reply_packer import (
+    EMBED_DESCRIPTION_LIMIT, EMBED_TOTAL_LIMIT, EMBEDS_PER_MESSAGE, MESSAGE_LIMIT, _FENCE, _closes,
+    pack_embeds, split_markdown,
+)
+
+_FENCE_LINE = re.compile(r"^\s*(`{3,}|~{3,}).*$", re.MULTILINE)
+
+
+def open_fence(chunk: str) -> str | None:
+    """The fence marker still open at the end of ``chunk``, if any."""
+    marker = None
+    for line in chunk.split("\n"):
+        if marker is None:
+            match = _FENCE.match(line)
+            if match:
+                marker = match.group(1)
+        elif _closes(line, marker):
+            marker = None
+    return marker
+
+
+def visible(chunks: list[str]) -> str:
+    """The text without whitespace and fence lines, to check nothing is lost or duplicated."""
+    return "".join(_FENCE_LINE.sub("", "\n".join(chunks)).split())
+
+
+def check(text: str, limit: int = MESSAGE_LIMIT) -> list[str]:
+    chunks = split_markdown(text, limit)
+    assert all(0 < len(c) <= limit for c in chunks)
+    # Only the last chunk may leave a fence open, and only if the input did
+    for chunk in chunks[:-1]:
+        assert open_fence(chunk) is None
+    if open_fence(text) is None:
+        assert open_fence(chunks[-1]) is None
+    assert visible(chunks) == visible([text])
+    return chunks
+
+
+def code(lines: int, width: int = 40) -> str:
+    return "\n".join(f"x_{i} = {'y' * width}" for i in range(lines))
+
+
+def test_short_text_is_untouched():
+    assert split_markdown("hello **world**") == ["hello **world**"]
+
+
+def test_splits_at_paragraphs():
+    paragraphs = ["p" * 900, "q" * 900, "r" * 900]
+    assert check("\n\n".join(paragraphs)) == ["p" * 900 + "\n\n" + "q" * 900, "r" * 900]
+
+
+@pytest.mark.parametrize("marker", ["```", "~~~"])
+def test_long_fence_is_closed_and_reopened_with_language(marker):
+    text = f"Intro.\n\n{marker}python\n{code(200)}\n{marker}\n\nOutro."
+    chunks = check(text)
+    assert len(chunks) > 1
+    for chunk in chunks[1:-1]:
+        assert chunk.startswith(f"{marker}python\n") and chunk.endswith(f"\n{marker}")
+
+
+@pytest.mark.parametrize("marker", ["```", "~~~"])
+def test_unclosed_fence(marker):
+    chunks = check(f"Look:\n\n{marker}js\n{code(200)}")
+    assert all(c.endswith(f"\n{marker}") for c in chunks[:-1])
+    # The last piece stays open so a streamed reply can keep extending it
+    assert open_fence(chunks[-1]) == marker
+
+
+def test_fence_longer_than_three_backticks():
+    # A ```` block may contain ``` lines that do not close it
+    body = "\n".join(["```", code(80), "```"] * 3)
+    chunks = check(f"````md\n{body}\n````")
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.startswith("````md\n")
+    for chunk in chunks[:-1]:
+        assert chunk.endswith("\n````")
+
+
+def test_long_line_with_spaces_splits_between_words():
+    chunks = check("lorem ipsum " * 500)
+    assert all(not c.startswith(" ") for c in chunks)
+    assert all(len(c) > MESSAGE_LIMIT // 2 for c in chunks[:-1])
+
+
+def test_long_line_without_spaces_is_cut_at_the_limit():
+    chunks = check("z" * 5000)
+    assert [len(c) for c in chunks] == [2000, 2000, 1000]
+
+
+def test_long_line_inside_fence():
+    chunks = check("```\n" + "z" * 5000 + "\n```")
+    assert all(c.startswith("```\n") and c.endswith("\n```") for c in chunks)
+
+
+def test_fence_exactly_at_limit_stays_whole():
+    opener, closer = "```py\n", "\n```"
+    text = opener + "a" * (MESSAGE_LIMIT - len(opener) - len(closer)) + closer
+    assert len(text) == MESSAGE_LIMIT
+    assert split_markdown(text) == [text]
+    assert check("intro\n\n" + text) == ["intro", text]
+
+
+def test_very_long_fence_opener():
+    chunks = check("```" + "x" * 3000 + "\n" + code(100) + "\n```", limit=500)
+    assert all(len(c) <= 500 for c in chunks)
+
+
+def test_random_markdown():
+    rng = random.Random(1)
+    pieces = ["word ", "b ", " ", "\n", "\n\n", "\n```\n", "\n```py\n", "\n~~~\n", "\n````\n", "x" * 50]
+    for _ in range(2000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 400)))
+        if text.strip():
+            check(text, rng.randint(120, 400))
+
+
+@pytest.mark.parametrize("text", [
+    "para " * 1000 + "\n\n" + ("word " * 500 + "\n\n") * 20,
+    "```py\n" + code(2000) + "\n```",
+    "z" * 70_000,
+], ids=["paragraphs", "code", "one-line"])
+def test_pack_embeds_limits(text):
+    messages = pack_embeds(text)
+    for descriptions in messages:
+        assert 0 < len(descriptions) <= EMBEDS_PER_MESSAGE
+        assert sum(len(d) for d in descriptions) <= EMBED_TOTAL_LIMIT
+        assert all(len(d) <= EMBED_DESCRIPTION_LIMIT for d in descriptions)
+    assert visible([d for m in messages for d in m]) == visible([text])
+
+
+def test_pack_embeds_needs_fewer_sends_than_plain_messages():
+    text = ("lorem ipsum dolor " * 60 + "\n\n") * 20
+    assert len(pack_embeds(text)) * 2 < len(split_markdown(text))
@@ -0,0 +1,55 @@
+import pytest
+
+from utils.spam import SpamEngine
+
+GUILD = 1
+
+
+def engine() -> SpamEngine:
+    return SpamEngine(
+        window=5.0, max_messages=5, duplicate_window=30.0, max_duplicates=3, max_channels=2,
+        mass_users=5, min_length=12, max_members=1000, max_texts=1000,
+    )
+
+
+def crowd(spam: SpamEngine, content: str, users: int = 8) -> list[str | None]:
+    """Distinct members posting ``content`` once each, a second apart, in one channel."""
+    return [spam.observe(GUILD, 100 + i, 10, content, now=float(i)) for i in range(users)]
+
+
+def test_crowd_congratulating_is_not_spam():
+    assert crowd(engine(), "Congratulations!!") == [None] * 8
+
+
+@pytest.mark.parametrize("content", [
+    "FREE NITRO at https://discord-gift.example/claim",
+    "join discord.gg/raidraid now",
+    "@everyone look at this right now",
+    "hey <@1234567890> look at this right now",
+])
+def test_crowd_pasting_a_link_or_mention_is_mass_duplicate(content):
+    results = crowd(engine(), content)
+    assert results[:4] == [None] * 4
+    assert results[4:] == ["mass-duplicate"] * 4
+
+
+def test_one_member_repeating_text_is_duplicate():
+    spam = engine()
+    results = [spam.observe(GUILD, 100, 10, "Congratulations!!", now=i * 2.0) for i in range(4)]
+    assert results == [None, None, None, "duplicate"]
+
+
+def test_one_member_across_channels_is_cross_channel():
+    spam = engine()
+    results = [spam.observe(GUILD, 100, channel, "Congratulations!!", now=float(channel)) for channel in range(3)]
+    assert results == [None, None, "cross-channel"]
+
+
+def test_rate_limit():
+    spam = engine()
+    results = [spam.observe(GUILD, 100, 10, f"message {i}", now=i * 0.1) for i in range(6)]
+    assert results == [None] * 5 + ["rate"]
+
+
+def test_short_messages_are_not_fingerprinted():
+    assert crowd(engine(), "gg https://x") == [None] * 8
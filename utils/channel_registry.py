@@ -0,0 +1,154 @@
+import os
+
+import discord
+
+from utils.storage import JsonSaver, read_json
+
+
+class ChannelRegistry:
+    """Which channels play which role (welcome, ai, ...) in each guild, persisted to ``data/channels.json``.
+
+    Roles map to channel IDs, with the reverse map kept alongside, so both
+    "the welcome channel of this guild" and "is this an AI channel" are
+    dict lookups. Renaming a channel changes nothing. A guild is scanned
+    once, the first time it is looked up: roles without a channel adopt one
+    whose name is in ``names[role]``, so channels set up by name keep
+    working. After that, channel create and update events adopt newly named
+    channels, and deleting a role's channel frees it.
+
+    Most roles have one channel. Roles in ``multi`` (the AI chat) may have
+    several and adopt every channel carrying one of their names.
+
+    Every change is announced as ``on_channel_role_update(guild, role,
+    removed_id, added_id)``, for caches built on top of the registry.
+    """
+
+    def __init__(self, bot: discord.Client, names: dict[str, tuple[str, ...]], multi: tuple[str, ...] = (),
+                 path: str = os.path.join("data", "channels.json")):
+        self.bot = bot
+        self.names = names
+        self.multi = multi
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        data = read_json(self.path, {})
+        self._channels: dict[int, dict[str, list[int]]] = {
+            # Older files stored a single ID per role
+            int(g): {role: ids if isinstance(ids, list) else [ids] for role, ids in roles.items()}
+            for g, roles in data.items()
+        }
+        self._roles: dict[int, set[str]] = {}
+        for roles in self._channels.values():
+            for role, ids in roles.items():
+                for channel_id in ids:
+                    self._roles.setdefault(channel_id, set()).add(role)
+        self._scanned: set[int] = set()
+        self._saver = JsonSaver(self.path, self._snapshot, "channel registry")
+
+        bot.add_listener(self._on_guild_remove, "on_guild_remove")
+        bot.add_listener(self._on_channel_create, "on_guild_channel_create")
+        bot.add_listener(self._on_channel_update, "on_guild_channel_update")
+        bot.add_listener(self._on_channel_delete, "on_guild_channel_delete")
+
+    # ── Lookup ───────────────────────────────────────────────────────
+
+    def get(self, guild: discord.Guild, role: str) -> discord.TextChannel | None:
+        self._scan(guild)
+        for channel_id in self._channels.get(guild.id, {}).get(role, ()):
+            channel = guild.get_channel(channel_id)
+            if isinstance(channel, discord.TextChannel):
+                return channel
+        return None
+
+    def has_role(self, channel: discord.abc.GuildChannel, role: str) -> bool:
+        self._scan(channel.guild)
+        return role in self._roles.get(channel.id, ())
+
+    def roles_of(self, channel_id: int) -> set[str]:
+        return set(self._roles.get(channel_id, ()))
+
+    # ── Assignment ───────────────────────────────────────────────────
+
+    def assign(self, role: str, channel: discord.abc.GuildChannel):
+        """Give ``channel`` the ``role``; for single-channel roles it replaces the current one."""
+        ids = self._channels.setdefault(channel.guild.id, {}).setdefault(role, [])
+        if channel.id in ids:
+            return
+        if role not in self.multi:
+            for old in list(ids):
+                self.unassign(channel.guild, role, old)
+            ids = self._channels.setdefault(channel.guild.id, {}).setdefault(role, [])
+        ids.append(channel.id)
+        self._roles.setdefault(channel.id, set()).add(role)
+        self._changed(channel.guild, role, None, channel.id)
+
+    def unassign(self, guild: discord.Guild, role: str, channel_id: int):
+        roles = self._channels.get(guild.id, {})
+        ids = roles.get(role, [])
+        if channel_id not in ids:
+            return
+        ids.remove(channel_id)
+        if not ids:
+            del roles[role]
+        if not roles:
+            self._channels.pop(guild.id, None)
+        channel_roles = self._roles.get(channel_id)
+        if channel_roles is not None:
+            channel_roles.discard(role)
+            if not channel_roles:
+                del self._roles[channel_id]
+        self._changed(guild, role, channel_id, None)
+
+    def _changed(self, guild: discord.Guild, role: str, removed: int | None, added: int | None):
+        self._saver.schedule()
+        self.bot.dispatch("channel_role_update", guild, role, removed, added)
+
+    # ── Discovery ────────────────────────────────────────────────────
+
+    def _adopt(self, channel: discord.abc.GuildChannel):
+        if not isinstance(channel, discord.TextChannel):
+            return
+        roles = self._channels.get(channel.guild.id, {})
+        for role, names in self.names.items():
+            if channel.name in names and (role in self.multi or role not in roles):
+                self.assign(role, channel)
+
+    def _scan(self, guild: discord.Guild):
+        if guild.id in self._scanned or guild.unavailable:
+            return
+        self._scanned.add(guild.id)
+        # Drop channels deleted while the bot was offline, then adopt by name
+        for role, ids in list(self._channels.get(guild.id, {}).items()):
+            for channel_id in list(ids):
+                if guild.get_channel(channel_id) is None:
+                    self.unassign(guild, role, channel_id)
+        for channel in guild.text_channels:
+            self._adopt(channel)
+
+    async def _on_guild_remove(self, guild: discord.Guild):
+        self._scanned.discard(guild.id)
+
+    async def _on_channel_create(self, channel: discord.abc.GuildChannel):
+        if channel.guild.id in self._scanned:
+            self._adopt(channel)
+
+    async def _on_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if after.guild.id in self._scanned and before.name != after.name:
+            self._adopt(after)
+
+    async def _on_channel_delete(self, channel: discord.abc.GuildChannel):
+        roles = self.roles_of(channel.id)
+        for role in roles:
+            self.unassign(channel.guild, role, channel.id)
+        if roles:
+            # Fall back to another channel still carrying a known name
+            for other in channel.guild.text_channels:
+                self._adopt(other)
+
+    # ── Persistence ──────────────────────────────────────────────────
+
+    def _snapshot(self) -> dict:
+        return {str(g): {role: list(ids) for role, ids in roles.items()} for g, roles in self._channels.items()}
+
+    async def flush(self):
+        await self._saver.flush()
@@ -0,0 +1,129 @@
+import os
+import re
+
+_HOST = re.compile(r"(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z][a-z0-9-]*[a-z0-9]")
+_INVITE = re.compile(r"(?:discord(?:app)?\.com/invite|discord\.gg)/[a-z0-9-]+")
+
+
+def _read_lines(path: str | None) -> list[str]:
+    if not path:
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    except FileNotFoundError:
+        return []
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over lower-cased phrases, matched on word boundaries.
+
+    One pass over the text finds any of the phrases, so a check costs
+    O(len(text)) whatever the number of phrases. Each node's outputs
+    already include those reachable through its failure links.
+    """
+
+    def __init__(self, phrases: list[str]):
+        goto: list[dict[str, int]] = [{}]
+        out: list[tuple[int, ...]] = [()]
+        for phrase in phrases:
+            phrase = phrase.lower()
+            node = 0
+            for ch in phrase:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = goto[node][ch] = len(goto)
+                    goto.append({})
+                    out.append(())
+                node = nxt
+            if phrase:
+                out[node] = out[node] + (len(phrase),)
+
+        # Breadth-first, so every failure target is final before it is used
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for node in queue:
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[child] = target if target != child else 0
+                if out[fail[child]]:
+                    out[child] = out[child] + out[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self.size = len(phrases)
+
+    def find(self, text: str) -> str | None:
+        """The first blocked phrase in ``text`` (already lower-cased), or None."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        end = len(text)
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                after_ok = i + 1 == end or not text[i + 1].isalnum()
+                if not after_ok:
+                    continue
+                for length in out[node]:
+                    start = i - length + 1
+                    if start == 0 or not text[start - 1].isalnum():
+                        return text[start:i + 1]
+        return None
+
+
+class ContentFilter:
+    """Blocked domains, phrases and (optionally) Discord invites in one check.
+
+    Phrases go through a ``PhraseMatcher``. Hostnames are pulled out of the
+    text with one regex pass and each is looked up label suffix by label
+    suffix (``a.b.example.com``, ``b.example.com``, ``example.com``...) in a
+    set, so subdomains of a blocked domain are caught in O(labels).
+    Instances are immutable; reloading builds a new one.
+    """
+
+    def __init__(self, phrases: list[str] = (), domains: list[str] = (), block_invites: bool = True):
+        self.phrases = PhraseMatcher(list(phrases))
+        self.domains = frozenset(d.lower().strip(".") for d in domains)
+        self.block_invites = block_invites
+
+    @classmethod
+    def from_files(cls, phrases_path: str | None, domains_path: str | None, block_invites: bool = True):
+        return cls(_read_lines(phrases_path), _read_lines(domains_path), block_invites)
+
+    def __len__(self) -> int:
+        return self.phrases.size + len(self.domains)
+
+    def check(self, content: str) -> str | None:
+        """Why ``content`` is blocked, or None."""
+        text = content.lower()
+        if self.block_invites and _INVITE.search(text):
+            return "invite link"
+        if self.domains and "." in text:
+            for match in _HOST.finditer(text):
+                labels = match.group().split(".")
+                for i in range(len(labels) - 1):
+                    domain = ".".join(labels[i:])
+                    if domain in self.domains:
+                        return f"blocked link ({domain})"
+        phrase = self.phrases.find(text)
+        if phrase:
+            return "blocked phrase"
+        return None
+
+
+def blocklist_mtimes(*paths: str | None) -> tuple[float, ...]:
+    """Modification times used to notice blocklist edits (0 for a missing file)."""
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime if path else 0.0)
+        except FileNotFoundError:
+            mtimes.append(0.0)
+    return tuple(mtimes)
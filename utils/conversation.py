@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict, deque
+from typing import Hashable
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English, plus per-message framing overhead
+    return len(text) // 4 + 4
+
+
+class ConversationMemory:
+    """Recent chat turns per conversation, bounded by tokens and by count.
+
+    Each conversation is a ring buffer of turns whose estimated token total
+    stays under ``token_budget``; the oldest turns are evicted first.
+    Conversations are kept in LRU order and the least recently used one is
+    dropped once more than ``max_conversations`` are live, so memory stays
+    capped no matter how many channels the bot talks in. Building a prompt
+    only walks the stored window and never fetches Discord history.
+    A conversation silent for more than ``idle_after`` seconds starts over.
+    """
+
+    def __init__(self, token_budget: int, max_conversations: int, idle_after: float | None = None):
+        self.token_budget = token_budget
+        self.max_conversations = max_conversations
+        self.idle_after = idle_after
+        self._conversations: OrderedDict[Hashable, deque] = OrderedDict()
+        self._tokens: dict[Hashable, int] = {}
+        self._last_active: dict[Hashable, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def add(self, key: Hashable, role: str, content: str):
+        turns = self._conversations.get(key)
+        if turns is None:
+            turns = self._conversations[key] = deque()
+            self._tokens[key] = 0
+            while len(self._conversations) > self.max_conversations:
+                evicted, _ = self._conversations.popitem(last=False)
+                del self._tokens[evicted]
+                del self._last_active[evicted]
+        else:
+            self._conversations.move_to_end(key)
+        self._last_active[key] = time.monotonic()
+
+        tokens = estimate_tokens(content)
+        turns.append((role, content, tokens))
+        self._tokens[key] += tokens
+        while self._tokens[key] > self.token_budget and turns:
+            _, _, dropped = turns.popleft()
+            self._tokens[key] -= dropped
+
+    def build_prompt(self, key: Hashable, system: str, content: str) -> list[dict]:
+        """System prompt, then as much history as fits, then the new message."""
+        messages = [{"role": "system", "content": system}]
+        if self.idle_after is not None and time.monotonic() - self._last_active.get(key, 0.0) > self.idle_after:
+            self.clear(key)
+        turns = self._conversations.get(key)
+        if turns:
+            self._conversations.move_to_end(key)
+            budget = self.token_budget - estimate_tokens(content)
+            window = []
+            for role, text, tokens in reversed(turns):
+                budget -= tokens
+                if budget < 0:
+                    break
+                window.append({"role": role, "content": text})
+            messages.extend(reversed(window))
+        messages.append({"role": "user", "content": content})
+        return messages
+
+    def clear(self, key: Hashable):
+        if self._conversations.pop(key, None) is not None:
+            del self._tokens[key]
+            del self._last_active[key]
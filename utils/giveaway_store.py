@@ -0,0 +1,125 @@
+import asyncio
+import os
+from array import array
+
+from config import GIVEAWAY_JOURNAL_FLUSH_INTERVAL
+from utils.participants import ParticipantStore
+from utils.storage import read_json, write_json_atomic
+
+
+class GiveawayStore:
+    """Crash-safe giveaway persistence under ``data/giveaways``.
+
+    Giveaway metadata lives in ``state.json`` and is rewritten atomically on
+    the rare lifecycle events (start, end, cancel, reroll). Participants are
+    appended to a per-giveaway journal of fixed-width 64-bit user IDs. Appends
+    are buffered and group-committed by a background task, so a burst of joins
+    costs one write + fsync per flush interval instead of one per click.
+    """
+
+    RECORD_SIZE = array("q").itemsize
+
+    def __init__(self, path: str = os.path.join("data", "giveaways"),
+                 flush_interval: float = GIVEAWAY_JOURNAL_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        os.makedirs(self.path, exist_ok=True)
+
+        self._pending: dict[int, array] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    # ── Lifecycle ────────────────────────────────────────────────────
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        await self.flush()
+
+    # ── State snapshot ───────────────────────────────────────────────
+
+    def _state_path(self) -> str:
+        return os.path.join(self.path, "state.json")
+
+    def load_state(self) -> dict:
+        return read_json(self._state_path(), {})
+
+    async def save_state(self, state: dict):
+        await asyncio.to_thread(write_json_atomic, self._state_path(), state)
+
+    # ── Participant journal ──────────────────────────────────────────
+
+    def _journal_path(self, message_id: int) -> str:
+        return os.path.join(self.path, f"{message_id}.journal")
+
+    def append(self, message_id: int, user_id: int):
+        buffer = self._pending.get(message_id)
+        if buffer is None:
+            buffer = self._pending[message_id] = array("q")
+        buffer.append(user_id)
+        self._wakeup.set()
+
+    def _write_batch(self, batch: dict[int, array]):
+        for message_id, ids in batch.items():
+            with open(self._journal_path(message_id), "ab") as f:
+                f.write(ids.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except OSError as e:
+                print(f"Failed to write giveaway journal: {e}")
+                # Put the batch back in front of anything appended meanwhile
+                for message_id, ids in self._pending.items():
+                    batch.setdefault(message_id, array("q")).extend(ids)
+                self._pending = batch
+
+    async def _flush_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.flush()
+            # Let joins accumulate so the next write covers a whole batch
+            await asyncio.sleep(self.flush_interval)
+
+    def load_participants(self, message_id: int) -> ParticipantStore:
+        path = self._journal_path(message_id)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return ParticipantStore()
+
+        # A crash mid-write can leave a partial record at the tail
+        torn = len(data) % self.RECORD_SIZE
+        if torn:
+            data = data[:-torn]
+            with open(path, "r+b") as f:
+                f.truncate(len(data))
+
+        ids = array("q")
+        ids.frombytes(data)
+        return ParticipantStore(ids)
+
+    def _remove_journal(self, message_id: int):
+        try:
+            os.remove(self._journal_path(message_id))
+        except FileNotFoundError:
+            pass
+
+    async def delete_journal(self, message_id: int):
+        # Hold the flush lock so an in-flight batch cannot recreate the file
+        async with self._flush_lock:
+            self._pending.pop(message_id, None)
+            await asyncio.to_thread(self._remove_journal, message_id)
@@ -0,0 +1,138 @@
+import asyncio
+from typing import Awaitable, Callable
+
+import discord
+
+Handler = Callable[[discord.Message], Awaitable[None]]
+ChannelMatcher = Callable[[discord.abc.GuildChannel], bool]
+GuildMatcher = Callable[[discord.Guild], bool]
+
+
+class MessageRouter:
+    """Sends each message only to the handlers that care about its channel.
+
+    Handlers register either globally (every message, e.g. anti-spam), per
+    channel or per guild. Channel and guild routes are given as matchers
+    that are evaluated when a channel or guild appears or changes, never per
+    message; the results are kept in dicts keyed by channel ID and guild ID,
+    so dispatch is a couple of lookups however many routes exist. Messages
+    in threads route through their parent channel.
+
+    Like ``discord.py`` listeners, each handler runs in its own task.
+    """
+
+    def __init__(self, bot: discord.Client):
+        self.bot = bot
+        self._global: list[Handler] = []
+        self._channel_routes: list[tuple[ChannelMatcher, Handler]] = []
+        self._guild_routes: list[tuple[GuildMatcher, Handler]] = []
+        self._by_channel: dict[int, tuple[Handler, ...]] = {}
+        self._by_guild: dict[int, tuple[Handler, ...]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+        bot.add_listener(self.rebuild, "on_ready")
+        bot.add_listener(self._on_guild_join, "on_guild_join")
+        bot.add_listener(self._on_guild_join, "on_guild_available")
+        bot.add_listener(self._on_guild_remove, "on_guild_remove")
+        bot.add_listener(self._on_guild_update, "on_guild_update")
+        bot.add_listener(self._on_channel_create, "on_guild_channel_create")
+        bot.add_listener(self._on_channel_update, "on_guild_channel_update")
+        bot.add_listener(self._on_channel_delete, "on_guild_channel_delete")
+
+    # ── Registration ─────────────────────────────────────────────────
+
+    def add_global(self, handler: Handler):
+        self._global.append(handler)
+
+    def add_channel_route(self, matcher: ChannelMatcher, handler: Handler):
+        self._channel_routes.append((matcher, handler))
+        for channel in self.bot.get_all_channels():
+            self.index_channel(channel)
+
+    def add_guild_route(self, matcher: GuildMatcher, handler: Handler):
+        self._guild_routes.append((matcher, handler))
+        for guild in self.bot.guilds:
+            self.index_guild(guild, channels=False)
+
+    def remove(self, handler: Handler):
+        """Drop every route to ``handler``, e.g. when its cog unloads."""
+        self._global = [h for h in self._global if h != handler]
+        self._channel_routes = [(m, h) for m, h in self._channel_routes if h != handler]
+        self._guild_routes = [(m, h) for m, h in self._guild_routes if h != handler]
+        self.rebuild_index()
+
+    # ── Index ────────────────────────────────────────────────────────
+
+    def index_channel(self, channel: discord.abc.GuildChannel):
+        handlers = tuple(h for matcher, h in self._channel_routes if matcher(channel))
+        if handlers:
+            self._by_channel[channel.id] = handlers
+        else:
+            self._by_channel.pop(channel.id, None)
+
+    def index_guild(self, guild: discord.Guild, channels: bool = True):
+        handlers = tuple(h for matcher, h in self._guild_routes if matcher(guild))
+        if handlers:
+            self._by_guild[guild.id] = handlers
+        else:
+            self._by_guild.pop(guild.id, None)
+        if channels:
+            for channel in guild.channels:
+                self.index_channel(channel)
+
+    def forget_guild(self, guild: discord.Guild):
+        self._by_guild.pop(guild.id, None)
+        for channel in guild.channels:
+            self._by_channel.pop(channel.id, None)
+
+    def rebuild_index(self):
+        self._by_channel.clear()
+        self._by_guild.clear()
+        for guild in self.bot.guilds:
+            self.index_guild(guild)
+
+    async def rebuild(self):
+        self.rebuild_index()
+        print(f"Message router: {len(self._by_channel)} routed channel(s), {len(self._by_guild)} guild(s)")
+
+    async def _on_guild_join(self, guild: discord.Guild):
+        self.index_guild(guild)
+
+    async def _on_guild_remove(self, guild: discord.Guild):
+        self.forget_guild(guild)
+
+    async def _on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        self.index_guild(after, channels=False)
+
+    async def _on_channel_create(self, channel: discord.abc.GuildChannel):
+        self.index_channel(channel)
+
+    async def _on_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        self.index_channel(after)
+
+    async def _on_channel_delete(self, channel: discord.abc.GuildChannel):
+        self._by_channel.pop(channel.id, None)
+
+    # ── Dispatch ─────────────────────────────────────────────────────
+
+    def handlers_for(self, message: discord.Message) -> list[Handler]:
+        channel = message.channel
+        channel_id = channel.parent_id if isinstance(channel, discord.Thread) else channel.id
+        handlers = list(self._global)
+        handlers.extend(self._by_channel.get(channel_id, ()))
+        if message.guild is not None:
+            handlers.extend(self._by_guild.get(message.guild.id, ()))
+        return handlers
+
+    def dispatch(self, message: discord.Message):
+        for handler in self.handlers_for(message):
+            task = asyncio.create_task(self._run(handler, message))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _run(handler: Handler, message: discord.Message):
+        try:
+            await handler(message)
+        except Exception as e:
+            print(f"Error in message handler {getattr(handler, '__qualname__', handler)}: {e}")
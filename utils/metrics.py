@@ -0,0 +1,29 @@
+from collections import deque
+
+
+class LatencyTracker:
+    """Rolling window of latency samples (seconds) with percentile queries."""
+
+    def __init__(self, window: int = 500):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, p: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> str:
+        if not self._samples:
+            return "no samples"
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return f"p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms (n={self.count})"
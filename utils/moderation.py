@@ -0,0 +1,184 @@
+import asyncio
+import datetime
+import time
+from collections import OrderedDict
+
+import discord
+
+
+class TokenBucket:
+    """Allows ``rate`` operations per second on average, in bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def format_duration(seconds: int) -> str:
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600} h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60} min"
+    return f"{seconds} s"
+
+
+class ModerationQueue:
+    """Serializes automatic punishments so a spam burst costs a handful of API calls.
+
+    A member with an action queued or a timeout still running is not queued
+    again, however many more messages arrive. Each offence is remembered for
+    ``offence_ttl`` seconds and repeat offences walk up ``escalation``
+    (timeout seconds per step, ``None`` for a kick). Actions and notices
+    share one token bucket, and notices are collected for ``notice_delay``
+    seconds into a single summary message per channel.
+    """
+
+    KICK_GRACE = 30  # seconds a kicked member stays deduplicated while their last messages arrive
+
+    def __init__(self, escalation: list[int | None], offence_ttl: float, rate: float, burst: int,
+                 notice_delay: float):
+        self.escalation = escalation
+        self.offence_ttl = offence_ttl
+        self.notice_delay = notice_delay
+        self.bucket = TokenBucket(rate, burst)
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._pending: set[int] = set()
+        self._in_force: dict[int, float] = {}
+        self._offences: OrderedDict[int, list[float]] = OrderedDict()
+        self._notices: dict[int, tuple[discord.abc.Messageable, list[str]]] = {}
+        self._worker: asyncio.Task | None = None
+        self._notice_task: asyncio.Task | None = None
+
+        self.executed = 0
+        self.deduplicated = 0
+        self.failed = 0
+
+    def start(self):
+        self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        for task in (self._worker, self._notice_task):
+            if task:
+                task.cancel()
+
+    @staticmethod
+    def _key(member: discord.Member) -> int:
+        return member.guild.id << 64 | member.id
+
+    def offence_count(self, member: discord.Member, now: float | None = None) -> int:
+        if now is None:
+            now = time.monotonic()
+        history = self._offences.get(self._key(member), [])
+        return sum(1 for t in history if now - t < self.offence_ttl)
+
+    def _handled(self, key: int, now: float) -> bool:
+        if key in self._pending or self._in_force.get(key, 0) > now:
+            self.deduplicated += 1
+            return True
+        self._in_force.pop(key, None)
+        return False
+
+    def punish(self, member: discord.Member, channel: discord.abc.Messageable, reason: str) -> bool:
+        """Queue the next escalation step for ``member``; False if already handled."""
+        now = time.monotonic()
+        key = self._key(member)
+        if self._handled(key, now):
+            return False
+        self._expire(now)
+
+        history = [t for t in self._offences.pop(key, []) if now - t < self.offence_ttl]
+        step = self.escalation[min(len(history), len(self.escalation) - 1)]
+        history.append(now)
+        self._offences[key] = history[-len(self.escalation):]
+
+        self._pending.add(key)
+        if step is None:
+            reason, notice = f"Repeated spamming ({reason})", "for repeated spamming"
+        else:
+            reason, notice = f"Spamming ({reason})", "for spamming"
+        self._queue.put_nowait((key, member, channel, step, reason, notice))
+        return True
+
+    def act(self, member: discord.Member, step: int | None, reason: str,
+            channel: discord.abc.Messageable | None = None, notice: str | None = None) -> bool:
+        """Queue a fixed action (timeout seconds, or ``None`` to kick) outside the escalation ladder.
+
+        Deduplicated and rate-limited like ``punish``. ``notice`` ends the
+        channel notice (e.g. "for spamming"); without a ``channel`` none is posted.
+        """
+        now = time.monotonic()
+        key = self._key(member)
+        if self._handled(key, now):
+            return False
+        self._pending.add(key)
+        self._queue.put_nowait((key, member, channel, step, reason, notice))
+        return True
+
+    def _expire(self, now: float):
+        # Offence lists are kept in last-offence order, so expired ones sit at the front
+        while self._offences:
+            key, history = next(iter(self._offences.items()))
+            if now - history[-1] < self.offence_ttl:
+                break
+            del self._offences[key]
+        for key in [k for k, until in self._in_force.items() if until <= now]:
+            del self._in_force[key]
+
+    async def _run(self):
+        while True:
+            key, member, channel, step, reason, notice = await self._queue.get()
+            try:
+                await self.bucket.acquire()
+                if step is None:
+                    await member.kick(reason=reason)
+                    self._in_force[key] = time.monotonic() + self.KICK_GRACE
+                    line = f"👢 {member.mention} was kicked"
+                else:
+                    await member.timeout(datetime.timedelta(seconds=step), reason=reason)
+                    self._in_force[key] = time.monotonic() + step
+                    line = f"⏱️ {member.mention} was timed out for {format_duration(step)}"
+                if channel is not None:
+                    self._notify(channel, f"{line} {notice}" if notice else line)
+                self.executed += 1
+            except discord.Forbidden:
+                self.failed += 1
+                print(f"Could not punish {member}: Missing permissions")
+            except Exception as e:
+                self.failed += 1
+                print(f"Error punishing {member}: {e}")
+            finally:
+                self._pending.discard(key)
+
+    def _notify(self, channel: discord.abc.Messageable, line: str):
+        self._notices.setdefault(channel.id, (channel, []))[1].append(line)
+        if self._notice_task is None or self._notice_task.done():
+            self._notice_task = asyncio.create_task(self._send_notices())
+
+    async def _send_notices(self):
+        # Lines queued while this task awaits the bucket or a send go out in the next round
+        while self._notices:
+            await asyncio.sleep(self.notice_delay)
+            notices, self._notices = self._notices, {}
+            for channel, lines in notices.values():
+                if len(lines) > 10:
+                    lines = lines[:10] + [f"…and {len(lines) - 10} more"]
+                try:
+                    await self.bucket.acquire()
+                    await channel.send("\n".join(lines), delete_after=10)
+                except discord.HTTPException as e:
+                    print(f"Failed to send moderation notice in {channel}: {e}")
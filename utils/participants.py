@@ -0,0 +1,113 @@
+import random
+from array import array
+from typing import Iterable, Iterator
+
+_GOLDEN = 0x9E3779B97F4A7C15
+_U64 = 0xFFFFFFFFFFFFFFFF
+_EMPTY = -1
+
+
+class ParticipantStore:
+    """Compact set of Discord user IDs with O(k) winner draws.
+
+    IDs are kept in a dense ``array('q')`` (8 bytes each) so a uniform pick is
+    a single index. Dedup goes through an open-addressing hash table of
+    positions into that array (4 bytes per slot, at most half full), about
+    16-24 bytes per entrant against 60+ for a ``set`` of boxed ints.
+
+    Draws are a partial Fisher-Yates shuffle: every winner is swapped behind
+    the ``_undrawn`` boundary, so a draw costs O(k), never copies the pool,
+    and later rerolls cannot pick a previous winner.
+    """
+
+    __slots__ = ("_ids", "_table", "_mask", "_shift", "_undrawn")
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self._ids = array("q")
+        self._undrawn = 0
+        self._resize(16)
+        for user_id in ids:
+            self.add(user_id)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, user_id: int) -> bool:
+        return self._table[self._slot(user_id)] != _EMPTY
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    @property
+    def remaining(self) -> int:
+        """Entrants that have not been drawn yet."""
+        return self._undrawn
+
+    @property
+    def winners(self) -> list[int]:
+        """Everyone drawn so far, most recent first."""
+        return self._ids[self._undrawn:].tolist()[::-1]
+
+    # ── Hash index ───────────────────────────────────────────────────
+
+    def _resize(self, size: int):
+        self._table = array("i", [_EMPTY]) * size
+        self._mask = size - 1
+        self._shift = 64 - (size.bit_length() - 1)
+        table = self._table
+        for pos, user_id in enumerate(self._ids):
+            table[self._slot(user_id)] = pos
+
+    def _slot(self, user_id: int) -> int:
+        # Fibonacci hashing spreads the low-entropy low bits of snowflakes
+        i = ((user_id * _GOLDEN) & _U64) >> self._shift
+        table, ids, mask = self._table, self._ids, self._mask
+        while True:
+            pos = table[i]
+            if pos == _EMPTY or ids[pos] == user_id:
+                return i
+            i = (i + 1) & mask
+
+    def _swap(self, a: int, b: int):
+        if a == b:
+            return
+        ids, table = self._ids, self._table
+        slot_a, slot_b = self._slot(ids[a]), self._slot(ids[b])
+        ids[a], ids[b] = ids[b], ids[a]
+        table[slot_a], table[slot_b] = b, a
+
+    # ── Mutation ─────────────────────────────────────────────────────
+
+    def add(self, user_id: int) -> bool:
+        slot = self._slot(user_id)
+        if self._table[slot] != _EMPTY:
+            return False
+
+        pos = len(self._ids)
+        self._ids.append(user_id)
+        self._table[slot] = pos
+        # Keep drawn winners at the tail so late entries stay drawable
+        self._swap(self._undrawn, pos)
+        self._undrawn += 1
+
+        if len(self._ids) * 2 > len(self._table):
+            self._resize(len(self._table) * 2)
+        return True
+
+    def draw(self, count: int) -> list[int]:
+        """Pick up to ``count`` winners that have not been drawn before."""
+        winners = []
+        for _ in range(min(count, self._undrawn)):
+            last = self._undrawn - 1
+            self._swap(random.randrange(self._undrawn), last)
+            self._undrawn = last
+            winners.append(self._ids[last])
+        return winners
+
+    def mark_drawn(self, user_id: int):
+        """Exclude ``user_id`` from future draws, e.g. when restoring winners."""
+        pos = self._table[self._slot(user_id)]
+        if pos == _EMPTY or pos >= self._undrawn:
+            return
+        self._swap(pos, self._undrawn - 1)
+        self._undrawn -= 1
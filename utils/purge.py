@@ -0,0 +1,136 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+from utils.storage import read_json, write_json_atomic
+
+# Bulk delete only accepts messages younger than 14 days; leave a margin for clock skew
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+
+
+async def replace_channel(channel: discord.TextChannel, reason: str) -> discord.TextChannel:
+    """Wipe a channel in three API calls by swapping in a clone of it.
+
+    The clone keeps the name, topic, permission overwrites, category,
+    slowmode and NSFW flag; the old channel (and its history, pins, threads
+    and webhooks) is deleted. The channel ID changes.
+    """
+    clone = await channel.clone(reason=reason)
+    await clone.edit(position=channel.position, reason=reason)
+    await channel.delete(reason=reason)
+    return clone
+
+
+class ChannelPurger:
+    """Deletes a channel's history in 100-message pages, resumable across restarts.
+
+    Each page is bulk-deleted in one call when its messages are young
+    enough; older ones are deleted one by one, which is all the API allows.
+    Only messages from before the purge started are removed. After every
+    page the cursor is checkpointed to ``data/purges.json``, so a restart
+    resumes where it stopped instead of starting over. Progress is shown in
+    a status message in the channel, edited at most every
+    ``PROGRESS_INTERVAL`` seconds.
+    """
+
+    PAGE_SIZE = 100
+    PROGRESS_INTERVAL = 5.0
+
+    def __init__(self, path: str = os.path.join("data", "purges.json")):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._jobs: dict[int, dict] = {int(c): job for c, job in read_json(self.path, {}).items()}
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def is_running(self, channel_id: int) -> bool:
+        return channel_id in self._tasks
+
+    def pending(self) -> list[int]:
+        """Channels with a checkpointed purge that is not running yet."""
+        return [c for c in self._jobs if c not in self._tasks]
+
+    async def start(self, channel: discord.abc.Messageable, started_by: int):
+        status = await channel.send("🧹 Deleting messages…")
+        self._jobs[channel.id] = {
+            "before": status.id,  # everything older than the status message
+            "deleted": 0,
+            "started_by": started_by,
+            "status_id": status.id,
+        }
+        await self._save()
+        self.resume(channel)
+
+    def resume(self, channel: discord.abc.Messageable):
+        if channel.id in self._jobs and channel.id not in self._tasks:
+            task = asyncio.create_task(self._run(channel))
+            self._tasks[channel.id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(channel.id, None))
+
+    async def forget(self, channel_id: int):
+        task = self._tasks.pop(channel_id, None)
+        if task:
+            task.cancel()
+        if self._jobs.pop(channel_id, None) is not None:
+            await self._save()
+
+    async def close(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+    async def _save(self):
+        snapshot = {str(c): dict(job) for c, job in self._jobs.items()}
+        await asyncio.to_thread(write_json_atomic, self.path, snapshot)
+
+    async def _run(self, channel: discord.abc.Messageable):
+        job = self._jobs[channel.id]
+        status = channel.get_partial_message(job["status_id"])
+        last_progress = time.monotonic()
+        try:
+            while True:
+                page = [
+                    m async for m in channel.history(limit=self.PAGE_SIZE, before=discord.Object(job["before"]))
+                ]
+                if not page:
+                    break
+
+                cutoff = datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE
+                young = [m for m in page if m.created_at > cutoff]
+                old = [m for m in page if m.created_at <= cutoff]
+                if len(young) > 1:
+                    await channel.delete_messages(young)
+                else:
+                    old = young + old
+                for message in old:
+                    try:
+                        await message.delete()
+                    except discord.NotFound:
+                        pass
+
+                job["before"] = page[-1].id
+                job["deleted"] += len(page)
+                await self._save()
+
+                if time.monotonic() - last_progress >= self.PROGRESS_INTERVAL:
+                    last_progress = time.monotonic()
+                    try:
+                        await status.edit(content=f"🧹 Deleting messages… {job['deleted']:,} deleted so far.")
+                    except discord.HTTPException:
+                        pass
+        except discord.Forbidden:
+            print(f"Purge of #{channel} stopped: missing permissions")
+        except discord.HTTPException as e:
+            # Keep the checkpoint; the purge resumes on the next start
+            print(f"Purge of #{channel} interrupted after {job['deleted']} message(s): {e}")
+            return
+        else:
+            try:
+                await status.edit(content=f"🧹 Deleted {job['deleted']:,} message(s).", delete_after=10)
+            except discord.HTTPException:
+                pass
+            print(f"Purged {job['deleted']} message(s) from #{channel}")
+
+        self._jobs.pop(channel.id, None)
+        await self._save()
@@ -0,0 +1,91 @@
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+
+def suspicion_signals(member: discord.Member, new_account_age: timedelta) -> int:
+    """How many raid-account traits ``member`` has: a young account, a default avatar."""
+    signals = 0
+    if datetime.now(timezone.utc) - member.created_at < new_account_age:
+        signals += 1
+    if member.avatar is None:
+        signals += 1
+    return signals
+
+
+class RaidDetector:
+    """Per-guild sliding window of weighted joins with an automatic lockdown.
+
+    Each join weighs ``1 + signal_weight * signals``, so a wave of fresh,
+    avatar-less accounts trips the ``threshold`` sooner than a wave of
+    established ones. A lockdown lasts at least ``min_lockdown`` seconds
+    and ends once the weighted join rate has decayed below
+    ``exit_threshold``; ``expire`` checks that and should be called
+    periodically, since a raid that stops sends no more events.
+    """
+
+    def __init__(self, window: float, threshold: float, exit_threshold: float, min_lockdown: float,
+                 signal_weight: float):
+        self.window = window
+        self.threshold = threshold
+        self.exit_threshold = exit_threshold
+        self.min_lockdown = min_lockdown
+        self.signal_weight = signal_weight
+        # guild ID -> (join time, weight, member, signals)
+        self._joins: dict[int, deque[tuple[float, float, discord.Member, int]]] = {}
+        self._weight: dict[int, float] = {}
+        self._lockdowns: dict[int, float] = {}
+
+    def in_lockdown(self, guild_id: int) -> bool:
+        return guild_id in self._lockdowns
+
+    def join_rate(self, guild_id: int) -> float:
+        """Weighted joins in the current window."""
+        return self._weight.get(guild_id, 0.0)
+
+    def _prune(self, guild_id: int, now: float):
+        joins = self._joins.get(guild_id)
+        if joins is None:
+            return
+        cutoff = now - self.window
+        while joins and joins[0][0] < cutoff:
+            self._weight[guild_id] -= joins.popleft()[1]
+        if not joins:
+            del self._joins[guild_id]
+            self._weight.pop(guild_id, None)
+
+    def observe(self, member: discord.Member, signals: int, now: float | None = None) -> list[discord.Member]:
+        """Record a join; returns the suspected accounts to act on, if a lockdown is on."""
+        if now is None:
+            now = time.monotonic()
+        guild_id = member.guild.id
+        self._prune(guild_id, now)
+
+        weight = 1 + self.signal_weight * signals
+        self._joins.setdefault(guild_id, deque()).append((now, weight, member, signals))
+        self._weight[guild_id] = self._weight.get(guild_id, 0.0) + weight
+
+        if guild_id in self._lockdowns:
+            return [member] if signals else []
+        if self._weight[guild_id] < self.threshold:
+            return []
+
+        # Raid detected: the suspects that triggered it are acted on too
+        self._lockdowns[guild_id] = now
+        return [m for _, _, m, s in self._joins[guild_id] if s]
+
+    def expire(self, now: float | None = None) -> list[int]:
+        """Drop stale windows and end decayed lockdowns; returns the guilds released."""
+        if now is None:
+            now = time.monotonic()
+        for guild_id in list(self._joins):
+            self._prune(guild_id, now)
+        released = [
+            guild_id for guild_id, started in self._lockdowns.items()
+            if now - started >= self.min_lockdown and self.join_rate(guild_id) < self.exit_threshold
+        ]
+        for guild_id in released:
+            del self._lockdowns[guild_id]
+        return released
@@ -0,0 +1,175 @@
+import re
+
+# Discord limits
+MESSAGE_LIMIT = 2000
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBEDS_PER_MESSAGE = 10
+EMBED_TOTAL_LIMIT = 6000  # summed over every embed on one message
+
+_FENCE = re.compile(r"^\s*(`{3,}|~{3,})")
+
+
+def _closes(line: str, marker: str) -> bool:
+    stripped = line.strip()
+    return (
+        len(stripped) >= len(marker)
+        and stripped.startswith(marker[0] * len(marker))
+        and not stripped.strip(marker[0])
+    )
+
+
+def _blocks(text: str) -> list[tuple[str, str, str | None]]:
+    """Cut ``text`` into paragraphs and whole fenced code blocks.
+
+    Returns ``(separator, block, fence_marker)`` tuples, where ``separator``
+    is the newlines that preceded the block in the original text.
+    """
+    lines = text.split("\n")
+    blocks = []
+    blank = 0
+    i = 0
+    while i < len(lines):
+        if not lines[i].strip():
+            blank += 1
+            i += 1
+            continue
+        separator = "\n" * (blank + 1)
+        blank = 0
+
+        match = _FENCE.match(lines[i])
+        if match:
+            marker = match.group(1)
+            j = i + 1
+            while j < len(lines) and not _closes(lines[j], marker):
+                j += 1
+            blocks.append((separator, "\n".join(lines[i:j + 1]), marker))
+            i = j + 1
+        else:
+            j = i
+            while j < len(lines) and lines[j].strip() and not _FENCE.match(lines[j]):
+                j += 1
+            blocks.append((separator, "\n".join(lines[i:j]), None))
+            i = j
+    return blocks
+
+
+def _hard_split(line: str, limit: int) -> list[str]:
+    """Split one over-long line, at the last space before the limit when there is one."""
+    pieces = []
+    while len(line) > limit:
+        cut = line.rfind(" ", limit // 2, limit)
+        if cut == -1:
+            cut = limit
+        pieces.append(line[:cut])
+        line = line[cut:].lstrip(" ") if cut < limit else line[cut:]
+    pieces.append(line)
+    return pieces
+
+
+def _pack_lines(lines: list[str], limit: int, first_limit: int | None = None) -> list[str]:
+    """Greedily join lines into pieces; the first piece may have a smaller limit."""
+    pieces = []
+    current = None
+    for line in lines:
+        for part in _hard_split(line, limit):
+            cap = limit if pieces or first_limit is None else first_limit
+            if current is not None and len(current) + 1 + len(part) <= cap:
+                current += "\n" + part
+            else:
+                if current is not None:
+                    pieces.append(current)
+                current = part
+    if current is not None:
+        pieces.append(current)
+    return pieces
+
+
+def _split_fenced(block: str, marker: str, limit: int, first_limit: int | None = None) -> list[str]:
+    """Split a code block, closing the fence on each piece and re-opening it on the next."""
+    lines = block.split("\n")
+    opener = lines[0]
+    closed = len(lines) > 1 and _closes(lines[-1], marker)
+    body = lines[1:-1] if closed else lines[1:]
+    closer = marker[0] * len(marker)
+    if len(opener) > limit // 4:
+        # Only the language tag after the fence is worth repeating
+        tag = opener.strip().split()[0]
+        opener = tag if len(tag) <= limit // 4 else closer
+
+    overhead = len(opener) + len(closer) + 2
+    if limit - overhead < 20:
+        return _pack_lines(lines, limit, first_limit)
+
+    pieces = []
+    first_budget = None if first_limit is None else max(1, first_limit - overhead)
+    parts = _pack_lines(body, limit - overhead, first_budget) or [""]
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        # An unclosed final fence stays open, so streamed text can keep extending it
+        if last and not closed:
+            pieces.append(f"{opener}\n{part}")
+        else:
+            pieces.append(f"{opener}\n{part}\n{closer}")
+    return pieces
+
+
+def split_markdown(text: str, limit: int = MESSAGE_LIMIT) -> list[str]:
+    """Split ``text`` into chunks of at most ``limit`` characters.
+
+    Chunks end at paragraph boundaries where possible, then at line
+    boundaries, and only cut inside a line that is longer than ``limit``.
+    Code blocks are kept whole when they fit; a longer one is closed at the
+    end of each chunk and re-opened, with its language tag, in the next.
+    """
+    chunks = []
+    current = ""
+    for separator, block, marker in _blocks(text):
+        if current and len(current) + len(separator) + len(block) <= limit:
+            current += separator + block
+            continue
+        if len(block) <= limit:
+            if current:
+                chunks.append(current)
+            current = block
+            continue
+
+        # Too long for any chunk: top up the current one before starting new ones
+        room = limit - len(current) - len(separator) if current else limit
+        if room < limit // 4:
+            chunks.append(current)
+            current, separator, room = "", "", limit
+        if marker:
+            pieces = _split_fenced(block, marker, limit, room)
+        else:
+            pieces = _pack_lines(block.split("\n"), limit, room)
+        if current and len(current) + len(separator) + len(pieces[0]) <= limit:
+            pieces[0] = current + separator + pieces[0]
+        elif current:
+            chunks.append(current)
+        chunks.extend(pieces[:-1])
+        current = pieces[-1]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def pack_embeds(text: str) -> list[list[str]]:
+    """Split a long reply into embed descriptions, grouped by message.
+
+    Discord caps the text of all embeds on a message at 6000 characters, so
+    a 4096-character description leaves little room for a second one.
+    Chunks are cut at half that total instead, which lets most messages
+    carry two full chunks (~6000 characters) instead of one.
+    """
+    messages = []
+    current: list[str] = []
+    size = 0
+    for chunk in split_markdown(text, min(EMBED_DESCRIPTION_LIMIT, EMBED_TOTAL_LIMIT // 2)):
+        if current and (len(current) >= EMBEDS_PER_MESSAGE or size + len(chunk) > EMBED_TOTAL_LIMIT):
+            messages.append(current)
+            current, size = [], 0
+        current.append(chunk)
+        size += len(chunk)
+    if current:
+        messages.append(current)
+    return messages
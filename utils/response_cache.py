@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from utils.metrics import LatencyTracker
+from utils.storage import JsonSaver, read_json
+
+_PUNCTUATION = re.compile(r"[\s?!.,;:]+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Case, spacing and punctuation-insensitive form of a question."""
+    return _PUNCTUATION.sub(" ", text.lower()).strip()
+
+
+def cache_key(model: str, system: str, prompt: str) -> str:
+    """Key for a reply to ``prompt`` sent without any earlier conversation turns."""
+    raw = "\0".join((model, system, normalize_prompt(prompt)))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    """LRU + TTL cache of AI replies with single-flight upstream calls.
+
+    Entries expire ``ttl`` seconds after they are stored and the least
+    recently used ones are evicted past ``max_entries`` or ``max_bytes`` of
+    reply text. Concurrent misses for the same key share one upstream call.
+    When ``path`` is set the cache is loaded from that file and saved back
+    after every new entry.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int, path: str | None = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.bypassed = 0
+        self.saved_seconds = 0.0
+        self.upstream_latency = LatencyTracker()
+
+        self._saver = None
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._saver = JsonSaver(self.path, self._snapshot, "AI reply cache")
+            now = time.time()
+            for key, expires_at, value in read_json(self.path, []):
+                if expires_at > now:
+                    self._store(key, value, expires_at)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.coalesced + self.misses
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str):
+        self._store(key, value, time.time() + self.ttl)
+        if self._saver:
+            self._saver.schedule()
+
+    def _store(self, key: str, value: str, expires_at: float):
+        if key in self._entries:
+            self._remove(key)
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value.encode())
+
+    def _saved(self) -> float:
+        return self.upstream_latency.percentile(50) or 0.0
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> tuple[str, bool]:
+        """Return ``(reply, cached)``; ``cached`` is False only for the caller that ran ``compute``."""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            self.saved_seconds += self._saved()
+            return value, True
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            value = await asyncio.shield(task)
+            self.saved_seconds += self._saved()
+            return value, True
+
+        self.misses += 1
+        task = asyncio.create_task(self._compute(key, compute))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), False
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        start = time.perf_counter()
+        value = await compute()
+        self.upstream_latency.record(time.perf_counter() - start)
+        self.put(key, value)
+        return value
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits} hits, {self.coalesced} coalesced, {self.misses} misses "
+            f"({self.hit_rate:.0%} hit rate), {self.bypassed} follow-ups not cacheable, "
+            f"~{self.saved_seconds:.1f}s upstream time saved, "
+            f"{len(self)} entries / {self._bytes / 1024:.0f} KiB"
+        )
+
+    def _snapshot(self) -> list:
+        return [[key, expires_at, value] for key, (expires_at, value) in self._entries.items()]
+
+    async def flush(self):
+        if self._saver:
+            await self._saver.flush()
@@ -0,0 +1,90 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, Hashable
+
+
+class DeadlineScheduler:
+    """Fires ``callback(key)`` at wall-clock deadlines from a single task.
+
+    Deadlines sit in a binary heap and one task sleeps until the earliest of
+    them, however many are pending. ``schedule`` pushes a new entry and
+    invalidates any previous one for the same key, ``cancel`` only marks the
+    entry dead; dead entries are skipped when they reach the top of the heap,
+    so both operations are O(log n).
+    """
+
+    def __init__(self, callback: Callable[[Hashable], Awaitable[None]]):
+        self.callback = callback
+        self._heap: list[list] = []
+        self._entries: dict[Hashable, list] = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def schedule(self, key: Hashable, when: float):
+        """Schedule (or reschedule) ``key`` for the UNIX timestamp ``when``."""
+        self.cancel(key)
+        entry = [when, next(self._counter), key, True]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[3] = False
+        # Rebuild once dead entries dominate so the heap stays O(live)
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+            self._heap = [e for e in self._heap if e[3]]
+            heapq.heapify(self._heap)
+        return True
+
+    async def _run(self):
+        while True:
+            while self._heap and not self._heap[0][3]:
+                heapq.heappop(self._heap)
+
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            entry = heapq.heappop(self._heap)
+            del self._entries[entry[2]]
+            # Run callbacks in their own task so a slow one cannot delay the next deadline
+            task = asyncio.create_task(self._fire(entry[2]))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, key: Hashable):
+        try:
+            await self.callback(key)
+        except Exception as e:
+            print(f"Scheduled callback for {key} failed: {e}")
@@ -0,0 +1,157 @@
+import re
+import time
+from collections import OrderedDict
+
+_NOISE = re.compile(r"[\W_]+")
+# Raid pastes carry a link or pings; a crowd repeating plain text ("congrats!!") is just chat
+_PAYLOAD = re.compile(r"https?://|www\.|discord(?:app)?\.com/invite|discord\.gg/|<@[!&]?\d+>|@everyone|@here",
+                      re.IGNORECASE)
+
+
+def fingerprint(content: str, min_length: int) -> int | None:
+    """Hash of the text with case, spacing and punctuation removed, or None if too short."""
+    text = _NOISE.sub("", content.lower())
+    if len(text) < min_length:
+        return None
+    return hash(text)
+
+
+# Small lists trimmed by hand: a deque allocates a 64-slot block even for one item
+class _Member:
+    __slots__ = ("last_seen", "times")
+
+    def __init__(self):
+        self.last_seen = 0.0
+        self.times: list[float] = []
+
+
+class _Text:
+    __slots__ = ("last_seen", "posts")
+
+    def __init__(self):
+        self.last_seen = 0.0
+        self.posts: list[tuple[float, int, int]] = []  # (time, user, channel)
+
+
+class SpamEngine:
+    """Per-member rate windows plus duplicate-content tracking, with hard memory caps.
+
+    Rates are a sliding window: each member keeps only the timestamps of
+    their last ``max_messages + 1`` messages. Texts are tracked by a hash
+    of their normalized content, each with a short history of who posted
+    it where, which catches one member pasting the same text across
+    channels as well as many members pasting it at once. The latter only
+    counts when the text holds a link or a mention, so a channel answering
+    a giveaway with the same "Congratulations!!" is left alone.
+
+    Both tables are ``OrderedDict``s in last-seen order, so idle entries are
+    swept from the front in amortized O(1) and the idlest entry is evicted
+    once a table reaches its cap. Everything is keyed by guild, and nothing
+    here touches Discord, so ``observe`` is a few dict and list operations.
+    """
+
+    def __init__(self, window: float, max_messages: int, duplicate_window: float, max_duplicates: int,
+                 max_channels: int, mass_users: int, min_length: int, max_members: int, max_texts: int):
+        self.window = window
+        self.max_messages = max_messages
+        self.duplicate_window = duplicate_window
+        self.max_duplicates = max_duplicates
+        self.max_channels = max_channels
+        self.mass_users = mass_users
+        self.min_length = min_length
+        self.max_members = max_members
+        self.max_texts = max_texts
+        self._history = max(max_duplicates, max_channels, mass_users) * 2
+
+        # Keys pack the guild ID into the high bits: one int instead of a tuple
+        self._members: OrderedDict[int, _Member] = OrderedDict()
+        self._texts: OrderedDict[int, _Text] = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    @property
+    def tracked_texts(self) -> int:
+        return len(self._texts)
+
+    def observe(self, guild_id: int, user_id: int, channel_id: int, content: str,
+                now: float | None = None) -> str | None:
+        """Record one message and return why it is spam, or None."""
+        if now is None:
+            now = time.monotonic()
+        self._sweep(now)
+
+        key = guild_id << 64 | user_id
+        member = self._members.get(key)
+        if member is None:
+            member = self._members[key] = _Member()
+            if len(self._members) > self.max_members:
+                self._members.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._members.move_to_end(key)
+        member.last_seen = now
+        times = member.times
+        times.append(now)
+        if len(times) > self.max_messages + 1:
+            del times[0]
+        if len(times) > self.max_messages and now - times[0] < self.window:
+            return "rate"
+
+        digest = fingerprint(content, self.min_length)
+        if digest is None:
+            return None
+        key = guild_id << 64 | (digest & 0xFFFFFFFFFFFFFFFF)
+        text = self._texts.get(key)
+        if text is None:
+            text = self._texts[key] = _Text()
+            if len(self._texts) > self.max_texts:
+                self._texts.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._texts.move_to_end(key)
+        text.last_seen = now
+        text.posts.append((now, user_id, channel_id))
+        if len(text.posts) > self._history:
+            del text.posts[0]
+
+        cutoff = now - self.duplicate_window
+        copies = 0
+        channels = set()
+        users = set()
+        for posted_at, poster, channel in text.posts:
+            if posted_at < cutoff:
+                continue
+            users.add(poster)
+            if poster == user_id:
+                copies += 1
+                channels.add(channel)
+        if len(channels) > self.max_channels:
+            return "cross-channel"
+        if copies > self.max_duplicates:
+            return "duplicate"
+        if len(users) >= self.mass_users and _PAYLOAD.search(content):
+            return "mass-duplicate"
+        return None
+
+    def forget(self, guild_id: int, user_id: int):
+        """Reset a member's rate window, e.g. after they were punished."""
+        self._members.pop(guild_id << 64 | user_id, None)
+
+    def _sweep(self, now: float):
+        member_cutoff = now - self.window
+        members = self._members
+        while members:
+            key, member = next(iter(members.items()))
+            if member.last_seen >= member_cutoff:
+                break
+            del members[key]
+
+        text_cutoff = now - self.duplicate_window
+        texts = self._texts
+        while texts:
+            key, text = next(iter(texts.items()))
+            if text.last_seen >= text_cutoff:
+                break
+            del texts[key]
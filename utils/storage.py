@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+from typing import Callable
+
+
+def read_json(path: str, default=None):
+    """Load a JSON file, returning ``default`` if it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        print(f"Failed to read {path}: {e}")
+        return default
+
+
+def write_json_atomic(path: str, data):
+    """Write JSON so a crash leaves either the old or the new file, never half of one."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class JsonSaver:
+    """Saves ``snapshot()`` to ``path`` with ``write_json_atomic`` in a worker thread.
+
+    ``schedule`` only marks the data dirty; one task keeps writing the latest
+    snapshot until nothing changed during the last write, so a burst of
+    changes costs one or two writes instead of one each.
+    """
+
+    def __init__(self, path: str, snapshot: Callable[[], object], name: str):
+        self.path = path
+        self.snapshot = snapshot
+        self.name = name
+        self._task: asyncio.Task | None = None
+        self._dirty = False
+
+    def schedule(self):
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        await asyncio.sleep(0)
+        while self._dirty:
+            self._dirty = False
+            try:
+                await asyncio.to_thread(write_json_atomic, self.path, self.snapshot())
+            except OSError as e:
+                print(f"Failed to save {self.name}: {e}")
+
+    async def flush(self):
+        if self._task and not self._task.done():
+            await self._task
@@ -0,0 +1,147 @@
+import os
+from typing import Callable
+
+from utils.storage import JsonSaver, read_json
+
+
+class TicketStore:
+    """Ticket bookkeeping persisted to ``data/tickets.json``.
+
+    Maps each user ID to the channel ID of their open ticket, with the
+    reverse map kept alongside so channel deletes resolve in O(1). Owners are
+    tracked by ID, so lookups survive username changes. The store also
+    remembers the overflow categories the bot created for each base
+    category, the pre-created channels in the warm ticket pool, and tickets
+    that are closing but not yet deleted, so closes resume after a restart.
+    """
+
+    def __init__(self, path: str = os.path.join("data", "tickets.json")):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        data = read_json(self.path, {})
+        self._by_user: dict[int, int] = {int(u): c for u, c in data.get("owners", {}).items()}
+        self._by_channel: dict[int, int] = {c: u for u, c in self._by_user.items()}
+        self._overflow: dict[int, list[int]] = {int(b): list(c) for b, c in data.get("overflow", {}).items()}
+        self._pool: list[int] = list(data.get("pool", []))
+        self._closing: dict[int, dict] = {int(c): v for c, v in data.get("closing", {}).items()}
+        self._saver = JsonSaver(self.path, self._snapshot, "ticket index")
+
+    def __len__(self) -> int:
+        return len(self._by_user)
+
+    def channel_for(self, user_id: int) -> int | None:
+        return self._by_user.get(user_id)
+
+    def owner_of(self, channel_id: int) -> int | None:
+        return self._by_channel.get(channel_id)
+
+    def set_owner(self, user_id: int, channel_id: int):
+        old_channel = self._by_user.get(user_id)
+        if old_channel == channel_id:
+            return
+        if old_channel is not None:
+            self._by_channel.pop(old_channel, None)
+        old_owner = self._by_channel.get(channel_id)
+        if old_owner is not None:
+            self._by_user.pop(old_owner, None)
+
+        self._by_user[user_id] = channel_id
+        self._by_channel[channel_id] = user_id
+        self._saver.schedule()
+
+    def discard_channel(self, channel_id: int) -> int | None:
+        """Forget a deleted ticket, pool channel or overflow category."""
+        user_id = self._by_channel.pop(channel_id, None)
+        if user_id is not None:
+            self._by_user.pop(user_id, None)
+            self._saver.schedule()
+        if channel_id in self._pool:
+            self._pool.remove(channel_id)
+            self._saver.schedule()
+        for categories in self._overflow.values():
+            if channel_id in categories:
+                categories.remove(channel_id)
+                self._saver.schedule()
+        self.remove_close(channel_id)
+        return user_id
+
+    def prune(self, exists: Callable[[int], bool]):
+        """Drop entries whose channel no longer exists."""
+        tracked = set(self._by_channel) | set(self._pool) | set(self._closing)
+        for categories in self._overflow.values():
+            tracked.update(categories)
+        for channel_id in [c for c in tracked if not exists(c)]:
+            self.discard_channel(channel_id)
+
+    # ── Overflow categories ──────────────────────────────────────────
+
+    def overflow_categories(self, base_id: int) -> list[int]:
+        return list(self._overflow.get(base_id, ()))
+
+    def add_overflow_category(self, base_id: int, category_id: int):
+        self._overflow.setdefault(base_id, []).append(category_id)
+        self._saver.schedule()
+
+    def base_category(self, category_id: int | None) -> int | None:
+        """The base category ``category_id`` belongs to, if it is an overflow one."""
+        for base_id, categories in self._overflow.items():
+            if category_id in categories:
+                return base_id
+        return None
+
+    # ── Warm channel pool ────────────────────────────────────────────
+
+    @property
+    def pool_size(self) -> int:
+        return len(self._pool)
+
+    def add_pool_channel(self, channel_id: int):
+        self._pool.append(channel_id)
+        self._saver.schedule()
+
+    def pop_pool_channel(self) -> int | None:
+        if not self._pool:
+            return None
+        channel_id = self._pool.pop(0)
+        self._saver.schedule()
+        return channel_id
+
+    def is_pool_channel(self, channel_id: int) -> bool:
+        return channel_id in self._pool
+
+    # ── Pending closes ───────────────────────────────────────────────
+
+    def pending_closes(self) -> dict[int, dict]:
+        return dict(self._closing)
+
+    def get_close(self, channel_id: int) -> dict | None:
+        return self._closing.get(channel_id)
+
+    def add_close(self, channel_id: int, due: float, closed_by: int, closed_by_name: str):
+        self._closing[channel_id] = {
+            "due": due, "closed_by": closed_by, "closed_by_name": closed_by_name, "archived": False,
+        }
+        self._saver.schedule()
+
+    def mark_archived(self, channel_id: int):
+        if channel_id in self._closing:
+            self._closing[channel_id]["archived"] = True
+            self._saver.schedule()
+
+    def remove_close(self, channel_id: int):
+        if self._closing.pop(channel_id, None) is not None:
+            self._saver.schedule()
+
+    # ── Persistence ──────────────────────────────────────────────────
+
+    def _snapshot(self) -> dict:
+        return {
+            "owners": {str(u): c for u, c in self._by_user.items()},
+            "overflow": {str(b): list(c) for b, c in self._overflow.items()},
+            "pool": list(self._pool),
+            "closing": {str(c): dict(v) for c, v in self._closing.items()},
+        }
+
+    async def flush(self):
+        await self._saver.flush()
@@ -0,0 +1,150 @@
+import glob
+import gzip
+import json
+import os
+import sqlite3
+import threading
+
+
+def fts_query(text: str) -> str:
+    """Quote each word so user input can never be parsed as FTS5 syntax."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class TranscriptIndex:
+    """SQLite FTS5 full-text index over archived ticket transcripts.
+
+    Every archived ticket is indexed once, right after it is written, so
+    searches never touch the transcript files. All methods block and are
+    meant to be run through ``asyncio.to_thread``; a lock serializes them on
+    the shared connection.
+    """
+
+    BATCH_SIZE = 5000
+
+    def __init__(self, path: str = os.path.join("data", "transcripts.db")):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self.create_tables()
+
+    def create_tables(self):
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS tickets (
+                channel_id INTEGER PRIMARY KEY,
+                guild_id INTEGER,
+                name TEXT,
+                owner_id INTEGER,
+                archived_at TEXT,
+                path TEXT
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages USING fts5(
+                content,
+                author,
+                guild_id UNINDEXED,
+                channel_id UNINDEXED,
+                message_id UNINDEXED,
+                created_at UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+        ''')
+        self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ── Indexing ─────────────────────────────────────────────────────
+
+    def _insert_transcript(self, path: str) -> int:
+        """Insert one archive inside the caller's transaction; returns rows added."""
+        rows = []
+        added = 0
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            guild_id, channel_id = header["guild_id"], header["channel_id"]
+            if self.conn.execute("SELECT 1 FROM tickets WHERE channel_id = ?", (channel_id,)).fetchone():
+                # Re-archived ticket: replace its rows instead of duplicating them
+                self.conn.execute("DELETE FROM messages WHERE channel_id = ?", (channel_id,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tickets VALUES (?, ?, ?, ?, ?, ?)",
+                (channel_id, guild_id, header.get("name"), header.get("owner_id"), header.get("archived_at"), path),
+            )
+            for line in f:
+                record = json.loads(line)
+                if not record.get("content"):
+                    continue
+                rows.append((record["content"], record["author"], guild_id, channel_id,
+                             record["id"], record["created_at"]))
+                if len(rows) >= self.BATCH_SIZE:
+                    self.conn.executemany("INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?)", rows)
+                    added += len(rows)
+                    rows = []
+        if rows:
+            self.conn.executemany("INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?)", rows)
+            added += len(rows)
+        return added
+
+    def index_transcript(self, path: str) -> int:
+        with self._lock:
+            try:
+                added = self._insert_transcript(path)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return added
+
+    def rebuild(self, root: str = os.path.join("data", "transcripts")) -> tuple[int, int]:
+        """Re-index every archive under ``root``; returns (tickets, messages)."""
+        paths = sorted(glob.glob(os.path.join(root, "*", "*.jsonl.gz")))
+        tickets = messages = 0
+        with self._lock:
+            self.conn.executescript("DROP TABLE IF EXISTS tickets; DROP TABLE IF EXISTS messages;")
+            self.create_tables()
+            # Commit in batches so a huge archive never builds one giant transaction
+            pending = 0
+            for path in paths:
+                try:
+                    added = self._insert_transcript(path)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Skipping unreadable transcript {path}: {e}")
+                    continue
+                tickets += 1
+                messages += added
+                pending += added
+                if pending >= self.BATCH_SIZE:
+                    self.conn.commit()
+                    pending = 0
+            self.conn.commit()
+            self.conn.execute("INSERT INTO messages(messages) VALUES ('optimize')")
+            self.conn.commit()
+        return tickets, messages
+
+    # ── Search ───────────────────────────────────────────────────────
+
+    def search(self, guild_id: int, text: str, limit: int = 10) -> list[dict]:
+        query = fts_query(text)
+        if not query:
+            return []
+        with self._lock:
+            cursor = self.conn.execute('''
+                SELECT m.channel_id, m.message_id, m.author, m.created_at,
+                       snippet(messages, 0, '**', '**', '…', 16), t.name, t.owner_id
+                FROM messages AS m
+                LEFT JOIN tickets AS t ON t.channel_id = m.channel_id
+                WHERE messages MATCH ? AND m.guild_id = ?
+                ORDER BY bm25(messages)
+                LIMIT ?
+            ''', (query, guild_id, limit))
+            rows = cursor.fetchall()
+        return [
+            {
+                "channel_id": channel_id, "message_id": message_id, "author": author,
+                "created_at": created_at, "snippet": snippet, "ticket": name, "owner_id": owner_id,
+            }
+            for channel_id, message_id, author, created_at, snippet, name, owner_id in rows
+        ]
@@ -0,0 +1,151 @@
+import asyncio
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+import discord
+
+from config import (
+    TRANSCRIPT_ATTACHMENT_CONCURRENCY, TRANSCRIPT_ATTACHMENT_TIMEOUT, TRANSCRIPT_MAX_ATTACHMENT_BYTES,
+)
+
+
+def message_record(message: discord.Message) -> dict:
+    return {
+        "type": "message",
+        "id": message.id,
+        "author_id": message.author.id,
+        "author": str(message.author),
+        "created_at": message.created_at.isoformat(),
+        "content": message.content,
+        "attachments": [
+            {"id": a.id, "filename": a.filename, "url": a.url, "size": a.size}
+            for a in message.attachments
+        ],
+        "embeds": [e.to_dict() for e in message.embeds],
+    }
+
+
+class TranscriptArchiver:
+    """Streams a channel's history into ``data/transcripts`` as gzipped JSONL.
+
+    History is read one API page at a time and written as it arrives, so
+    memory stays bounded by a page no matter how long the ticket ran.
+    Attachments go through a bounded queue to a fixed pool of downloaders.
+    Downloads that fail, or are still pending when the attachment timeout
+    runs out, are skipped; their URLs stay in the transcript.
+    The archive is written to a temporary file and only renamed into place
+    after it has been fsynced, so a finished archive is always complete.
+    """
+
+    PAGE_SIZE = 100
+
+    def __init__(self, path: str = os.path.join("data", "transcripts"),
+                 attachment_concurrency: int = TRANSCRIPT_ATTACHMENT_CONCURRENCY,
+                 attachment_timeout: float = TRANSCRIPT_ATTACHMENT_TIMEOUT):
+        self.path = path
+        self.attachment_concurrency = attachment_concurrency
+        self.attachment_timeout = attachment_timeout
+        os.makedirs(self.path, exist_ok=True)
+
+    def archive_path(self, channel: discord.abc.GuildChannel) -> str:
+        return os.path.join(self.path, str(channel.guild.id), f"{channel.id}.jsonl.gz")
+
+    async def archive(self, channel: discord.TextChannel, header: dict | None = None) -> str:
+        """Write the full transcript of ``channel`` and return the archive path."""
+        path = self.archive_path(channel)
+        attachment_dir = os.path.join(os.path.dirname(path), str(channel.id))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        downloads: asyncio.Queue = asyncio.Queue(maxsize=self.attachment_concurrency * 4)
+        workers = [
+            asyncio.create_task(self._download_worker(downloads, attachment_dir))
+            for _ in range(self.attachment_concurrency)
+        ]
+        deadline = asyncio.get_running_loop().time() + self.attachment_timeout
+        downloading = True
+
+        tmp_path = path + ".tmp"
+        archive = await asyncio.to_thread(gzip.open, tmp_path, "wt", encoding="utf-8")
+        try:
+            record = {
+                "type": "ticket",
+                "channel_id": channel.id,
+                "guild_id": channel.guild.id,
+                "name": channel.name,
+                "archived_at": datetime.now(timezone.utc).isoformat(),
+                **(header or {}),
+            }
+            page = [json.dumps(record)]
+            count = 0
+
+            async for message in channel.history(limit=None, oldest_first=True):
+                page.append(json.dumps(message_record(message)))
+                count += 1
+                for attachment in message.attachments:
+                    if downloading:
+                        # Blocks when the downloaders fall behind, bounding memory
+                        downloading = await self._before(deadline, downloads.put(attachment))
+                if len(page) >= self.PAGE_SIZE:
+                    await asyncio.to_thread(archive.write, "\n".join(page) + "\n")
+                    page = []
+
+            if page:
+                await asyncio.to_thread(archive.write, "\n".join(page) + "\n")
+
+            if downloading:
+                downloading = await self._before(deadline, downloads.join())
+            if not downloading:
+                print(f"Attachment downloads for #{channel.name} timed out; keeping their URLs only")
+            await asyncio.to_thread(self._finish, archive, tmp_path, path)
+        except BaseException:
+            await asyncio.to_thread(archive.close)
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+        print(f"Archived {count} message(s) from #{channel.name} to {path}")
+        return path
+
+    @staticmethod
+    async def _before(deadline: float, awaitable) -> bool:
+        """Await ``awaitable`` until the loop time ``deadline``; False if it ran out first."""
+        try:
+            await asyncio.wait_for(awaitable, max(0.0, deadline - asyncio.get_running_loop().time()))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @staticmethod
+    def _finish(archive, tmp_path: str, path: str):
+        archive.close()
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        if os.name != "nt":
+            fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    async def _download_worker(self, queue: asyncio.Queue, attachment_dir: str):
+        while True:
+            attachment: discord.Attachment = await queue.get()
+            try:
+                if attachment.size <= TRANSCRIPT_MAX_ATTACHMENT_BYTES:
+                    os.makedirs(attachment_dir, exist_ok=True)
+                    target = os.path.join(attachment_dir, f"{attachment.id}_{attachment.filename}")
+                    await attachment.save(target)
+            except Exception as e:
+                # aiohttp and timeout errors included: a dead worker would stall the archive.
+                # The URL is still in the transcript; a missing file is not fatal
+                print(f"Failed to save attachment {attachment.id}: {e}")
+            finally:
+                queue.task_done()
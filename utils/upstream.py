@@ -0,0 +1,190 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from utils.metrics import LatencyTracker
+
+T = TypeVar("T")
+
+
+class CircuitBreaker:
+    """Skips an endpoint after ``failures`` consecutive errors.
+
+    Once ``cooldown`` seconds have passed the breaker lets a single trial
+    request through (half-open); its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failures: int, cooldown: float):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._consecutive = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def record_success(self):
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial = False
+
+    def release(self):
+        """Give back a trial that was cancelled before it finished."""
+        self._trial = False
+
+    def record_failure(self):
+        self._consecutive += 1
+        self._trial = False
+        if self._opened_at is not None or self._consecutive >= self.failures:
+            self._opened_at = time.monotonic()
+
+
+class Endpoint:
+    """One model on one API endpoint, with its own latency and failure history."""
+
+    def __init__(self, model: str, client, breaker: CircuitBreaker):
+        self.model = model
+        self.client = client
+        self.breaker = breaker
+        self.latency = LatencyTracker()
+        self.wins = 0
+        self.errors = 0
+
+
+class HedgedRouter:
+    """Races an ordered list of endpoints, hedging on slow first responses.
+
+    The first available endpoint is tried alone. If it has not answered
+    within its adaptive deadline (a rolling percentile of its own latency,
+    clamped to ``[min_delay, max_delay]``) the next endpoint is started as
+    well; a failure starts the next one immediately. The first answer wins
+    and every other attempt is cancelled. Endpoints whose breaker is open
+    are skipped unless nothing else is left. When the caller passes the
+    semaphore capping upstream calls, a hedge takes a slot of its own and is
+    skipped while none is free.
+    """
+
+    def __init__(self, endpoints: list[Endpoint], percentile: float, min_delay: float, max_delay: float):
+        self.endpoints = endpoints
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.hedges = 0
+        self.hedges_skipped = 0
+
+    def deadline(self, endpoint: Endpoint) -> float:
+        observed = endpoint.latency.percentile(self.percentile)
+        if observed is None:
+            return self.max_delay
+        return min(self.max_delay, max(self.min_delay, observed))
+
+    async def _attempt(self, endpoint: Endpoint, attempt: Callable[[Endpoint], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        result = await attempt(endpoint)
+        endpoint.latency.record(time.perf_counter() - start)
+        return result
+
+    async def race(self, attempt: Callable[[Endpoint], Awaitable[T]],
+                   discard: Callable[[T], Awaitable[None]] | None = None,
+                   slots: asyncio.Semaphore | None = None) -> tuple[Endpoint, T]:
+        """Return the first endpoint to answer ``attempt`` and its result.
+
+        ``discard`` releases results that arrive after a winner was already
+        picked, e.g. by closing a stream that will never be read. ``slots``
+        is the caller's concurrency cap; the caller already holds one slot
+        for the first attempt, and hedge slots are given back before return.
+        """
+        remaining = iter(self.endpoints)
+        running: dict[asyncio.Task, Endpoint] = {}
+        latest = self.endpoints[0]
+        last_error: BaseException | None = None
+        extra_slots = 0
+
+        def start(endpoint: Endpoint):
+            nonlocal latest
+            running[asyncio.create_task(self._attempt(endpoint, attempt))] = endpoint
+            latest = endpoint
+
+        def launch() -> bool:
+            for endpoint in remaining:
+                if endpoint.breaker.allow():
+                    start(endpoint)
+                    return True
+            return False
+
+        if not launch():
+            # Every breaker is open; trying the primary beats failing outright
+            start(self.endpoints[0])
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running, timeout=self.deadline(latest), return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    if slots is not None:
+                        # Queued requests come first; locked() is also true while any are waiting
+                        if slots.locked():
+                            self.hedges_skipped += 1
+                            continue
+                        await slots.acquire()  # returns at once, the semaphore is not locked
+                        extra_slots += 1
+                    if launch():
+                        self.hedges += 1
+                    elif slots is not None:
+                        slots.release()
+                        extra_slots -= 1
+                    continue
+
+                winner = None
+                for task in done:
+                    endpoint = running.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        endpoint.errors += 1
+                        endpoint.breaker.record_failure()
+                        last_error = error
+                        print(f"AI model {endpoint.model} failed: {error}")
+                    elif winner is None:
+                        endpoint.breaker.record_success()
+                        winner = (endpoint, task.result())
+                    else:
+                        endpoint.breaker.record_success()
+                        if discard is not None:
+                            await discard(task.result())
+                if winner is not None:
+                    winner[0].wins += 1
+                    return winner
+                if not running:
+                    launch()
+                # Failed hedges hand their slot back right away
+                while extra_slots and len(running) <= extra_slots:
+                    slots.release()
+                    extra_slots -= 1
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.wait(running)
+            for task, endpoint in running.items():
+                if task.cancelled():
+                    endpoint.breaker.release()
+                elif task.exception() is None and discard is not None:
+                    await discard(task.result())
+            for _ in range(extra_slots):
+                slots.release()
+        raise last_error or RuntimeError("no AI model available")
@@ -0,0 +1,173 @@
+import asyncio
+import io
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import discord
+
+CARD_SIZE = (900, 300)
+AVATAR_SIZE = 200
+FILENAME = "welcome.png"
+
+# Per-worker caches: each pool process decodes templates and loads fonts once
+_templates: dict[str | None, object] = {}
+_fonts: dict[int, object] = {}
+_font_path: str | None = None
+_mask = None
+
+
+def _init_worker(font_path: str | None):
+    global _font_path
+    _font_path = font_path
+    for size in (36, 56, 28):
+        _font(size)
+
+
+def _font(size: int):
+    from PIL import ImageFont
+
+    font = _fonts.get(size)
+    if font is None:
+        try:
+            font = ImageFont.truetype(_font_path, size) if _font_path else ImageFont.load_default(size=size)
+        except OSError:
+            font = ImageFont.load_default(size=size)
+        _fonts[size] = font
+    return font
+
+
+def _template(path: str | None):
+    """The background decoded and resized once, or a plain gradient when there is none."""
+    from PIL import Image
+
+    template = _templates.get(path)
+    if template is None:
+        if path and os.path.exists(path):
+            with Image.open(path) as image:
+                template = image.convert("RGB").resize(CARD_SIZE)
+        else:
+            template = Image.linear_gradient("L").rotate(90).resize(CARD_SIZE)
+            template = Image.merge("RGB", (template.point(lambda v: 30 + v // 6),
+                                           template.point(lambda v: 32 + v // 5),
+                                           template.point(lambda v: 40 + v // 3)))
+        _templates[path] = template
+    return template
+
+
+def _avatar_mask():
+    from PIL import Image, ImageDraw
+
+    global _mask
+    if _mask is None:
+        _mask = Image.new("L", (AVATAR_SIZE, AVATAR_SIZE), 0)
+        ImageDraw.Draw(_mask).ellipse((0, 0, AVATAR_SIZE - 1, AVATAR_SIZE - 1), fill=255)
+    return _mask
+
+
+def _fit(draw, text: str, font, width: int) -> str:
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength(text + "…", font=font) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+def render_card(avatar: bytes, name: str, member_count: int, guild_name: str, background: str | None) -> bytes:
+    """Draw a welcome card and return it as PNG bytes. Runs in a pool worker."""
+    from PIL import Image, ImageDraw
+
+    card = _template(background).copy()
+    with Image.open(io.BytesIO(avatar)) as image:
+        face = image.convert("RGB").resize((AVATAR_SIZE, AVATAR_SIZE))
+    top = (CARD_SIZE[1] - AVATAR_SIZE) // 2
+    card.paste(face, (50, top), _avatar_mask())
+
+    draw = ImageDraw.Draw(card)
+    draw.ellipse((46, top - 4, 54 + AVATAR_SIZE, top + AVATAR_SIZE + 4), outline=(255, 255, 255), width=4)
+    left = 50 + AVATAR_SIZE + 40
+    width = CARD_SIZE[0] - left - 30
+    draw.text((left, 70), _fit(draw, f"Welcome to {guild_name}", _font(28), width), font=_font(28),
+              fill=(200, 200, 210))
+    draw.text((left, 115), _fit(draw, name, _font(56), width), font=_font(56), fill=(255, 255, 255))
+    draw.text((left, 195), f"Member #{member_count:,}", font=_font(36), fill=(180, 180, 190))
+
+    out = io.BytesIO()
+    card.save(out, format="PNG", optimize=False, compress_level=1)
+    return out.getvalue()
+
+
+class WelcomeCardRenderer:
+    """Renders welcome cards off the event loop.
+
+    Drawing happens in a process pool (or a thread pool) whose workers keep
+    the decoded background templates and fonts between cards. Avatars are
+    downloaded once per avatar hash and kept in an LRU of ``avatar_cache``
+    entries, so repeat joiners and the handful of default avatars never hit
+    the CDN twice; concurrent joins with the same avatar share one download.
+    Guilds can have their own background at ``<background_dir>/<guild_id>.png``,
+    else ``default.png`` is used.
+    """
+
+    def __init__(self, workers: int = 2, avatar_cache: int = 512, background_dir: str | None = None,
+                 font_path: str | None = None, processes: bool = True):
+        self.background_dir = background_dir
+        self.avatar_cache = avatar_cache
+        self._avatars: OrderedDict[str, bytes] = OrderedDict()
+        self._downloads: dict[str, asyncio.Task] = {}
+        self.avatar_hits = 0
+        self.avatar_misses = 0
+        if processes:
+            # Forking the bot while its threads (to_thread, the gateway heartbeat) hold locks can deadlock
+            self._executor: Executor = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker, initargs=(font_path,),
+            )
+        else:
+            _init_worker(font_path)
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix="welcome-card")
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _background(self, guild_id: int) -> str | None:
+        if not self.background_dir:
+            return None
+        path = os.path.join(self.background_dir, f"{guild_id}.png")
+        if os.path.exists(path):
+            return path
+        return os.path.join(self.background_dir, "default.png")
+
+    async def _avatar(self, member: discord.Member) -> bytes:
+        asset = member.display_avatar.replace(size=256, format="png")
+        key = asset.key
+        data = self._avatars.get(key)
+        if data is not None:
+            self._avatars.move_to_end(key)
+            self.avatar_hits += 1
+            return data
+
+        download = self._downloads.get(key)
+        if download is not None:
+            self.avatar_hits += 1
+            return await asyncio.shield(download)
+
+        self.avatar_misses += 1
+        download = self._downloads[key] = asyncio.create_task(asset.read())
+        try:
+            data = await asyncio.shield(download)
+        finally:
+            self._downloads.pop(key, None)
+        self._avatars[key] = data
+        if len(self._avatars) > self.avatar_cache:
+            self._avatars.popitem(last=False)
+        return data
+
+    async def render(self, member: discord.Member) -> discord.File:
+        avatar = await self._avatar(member)
+        png = await asyncio.get_running_loop().run_in_executor(
+            self._executor, render_card, avatar, member.display_name, member.guild.member_count or 0,
+            member.guild.name, self._background(member.guild.id),
+        )
+        return discord.File(io.BytesIO(png), filename=FILENAME)